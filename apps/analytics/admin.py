@@ -1,21 +1,41 @@
 """
 Admin interface for analytics.
 """
+from datetime import timedelta
+
 from django.contrib import admin
-from django.db.models import Count
-from django.utils.html import format_html
-from .models import ResumeDownload
+from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import DownloadRollup, ResumeDownload
+from .sketch import HyperLogLog
+
+
+TREND_DAYS = 30
+
+
+class RollupPaginator(Paginator):
+    """Take the unfiltered row count from the rollups instead of COUNT(*)."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return DownloadRollup.get_total_downloads() + DownloadRollup.get_bot_downloads()
+        return super().count
 
 
 @admin.register(ResumeDownload)
 class ResumeDownloadAdmin(admin.ModelAdmin):
     """Admin interface for resume downloads."""
     
-    list_display = ['created_at', 'ip_address', 'download_source', 'country', 'city', 'user_agent_short']
-    list_filter = ['download_source', 'created_at', 'country']
+    list_display = ['created_at', 'ip_address', 'download_source', 'country', 'city', 'browser', 'device', 'is_bot', 'user_agent_short']
+    list_filter = ['is_bot', 'device', 'download_source', 'created_at', 'country']
     search_fields = ['ip_address', 'user_agent', 'country', 'city']
-    readonly_fields = ['created_at', 'updated_at', 'ip_address', 'user_agent', 'referrer', 'country', 'city', 'download_source']
-    date_hierarchy = 'created_at'
+    readonly_fields = ['created_at', 'updated_at', 'ip_address', 'user_agent', 'referrer', 'country', 'city', 'download_source', 'browser', 'os', 'device', 'is_bot']
+    # No date_hierarchy: its date drill-down scans the whole table; the
+    # created_at list filter covers the same ground
+    paginator = RollupPaginator
+    show_full_result_count = False
     
     def user_agent_short(self, obj):
         """Show shortened user agent."""
@@ -32,17 +52,55 @@ class ResumeDownloadAdmin(admin.ModelAdmin):
         """Make read-only."""
         return False
     
+    def delete_model(self, request, obj):
+        """Delete, then recompute the rollups of the download's day."""
+        super().delete_model(request, obj)
+        DownloadRollup.rebuild(days=[timezone.localdate(obj.created_at)])
+    
+    def delete_queryset(self, request, queryset):
+        """Delete, then recompute the rollups of every day that lost rows."""
+        days = {timezone.localdate(created_at) for created_at in queryset.values_list('created_at', flat=True)}
+        super().delete_queryset(request, queryset)
+        DownloadRollup.rebuild(days=days)
+    
     def changelist_view(self, request, extra_context=None):
-        """Add analytics summary to list view."""
+        """Add analytics summary and trend to list view (from the rollups only)."""
         extra_context = extra_context or {}
         
-        # Get analytics data
-        total_downloads = ResumeDownload.get_total_downloads()
-        unique_ips = ResumeDownload.get_unique_ips()
-        by_source = ResumeDownload.get_downloads_by_source()
+        trend = DownloadRollup.get_daily_trend(TREND_DAYS)
+        peak = max((count for day, count in trend), default=0)
         
-        extra_context['total_downloads'] = total_downloads
-        extra_context['unique_ips'] = unique_ips
-        extra_context['downloads_by_source'] = by_source
+        extra_context['total_downloads'] = DownloadRollup.get_total_downloads()
+        extra_context['bot_downloads'] = DownloadRollup.get_bot_downloads()
+        extra_context['unique_ips'] = DownloadRollup.get_unique_visitors()
+        extra_context['recent_unique_ips'] = DownloadRollup.get_unique_visitors(
+            since=timezone.localdate() - timedelta(days=TREND_DAYS - 1)
+        )
+        extra_context['downloads_by_source'] = DownloadRollup.get_downloads_by_source()
+        extra_context['trend_days'] = TREND_DAYS
+        extra_context['download_trend'] = [
+            {'day': day, 'count': count, 'height': round(count * 100 / peak) if peak else 0}
+            for day, count in trend
+        ]
         
         return super().changelist_view(request, extra_context)
+
+
+@admin.register(DownloadRollup)
+class DownloadRollupAdmin(admin.ModelAdmin):
+    """Read-only view of the per-day download rollups."""
+    
+    list_display = ['day', 'download_source', 'downloads', 'unique_visitors', 'bots']
+    list_filter = ['download_source']
+    exclude = ['visitors']
+    
+    def unique_visitors(self, obj):
+        """Estimated distinct IP addresses for the day."""
+        return HyperLogLog.from_bytes(obj.visitors).count()
+    unique_visitors.short_description = 'Unique visitors (est.)'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,133 @@
+"""
+Offline GeoIP lookups for resume downloads.
+
+Addresses are resolved against a local MaxMind-format database (GeoLite2-City
+or compatible) opened memory-mapped, so there is no network access and the
+file is shared between worker processes through the page cache. Results are
+kept in an LRU keyed by network prefix (/24 for IPv4, /48 for IPv6): city
+data is rarely finer-grained than that, and nearby visitors share entries.
+
+Enrichment runs when the download queue flushes (see tracking.py) or from
+``manage.py enrich_download_locations``, never in the request. Without the
+maxminddb package or a GEOIP_DATABASE file it does nothing.
+"""
+import ipaddress
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+try:
+    import maxminddb
+except ImportError:  # Optional: enrichment is skipped without it
+    maxminddb = None
+
+logger = logging.getLogger(__name__)
+
+IPV4_PREFIX = 24
+IPV6_PREFIX = 48
+
+
+def network_key(ip):
+    """The /24 or /48 network an address belongs to, or None if it isn't one."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = IPV4_PREFIX if address.version == 4 else IPV6_PREFIX
+    return ipaddress.ip_network(f'{address}/{prefix}', strict=False)
+
+
+class GeoIPResolver:
+    """Resolve IP addresses to (country, city) with a prefix-keyed LRU."""
+
+    def __init__(self, path, cache_size=4096):
+        self.path = path
+        self.cache_size = cache_size
+        self._reader = None
+        self._unavailable = False
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def reader(self):
+        """The open database, or None if it can't be used."""
+        if self._reader is None and not self._unavailable:
+            with self._lock:
+                if self._reader is None and not self._unavailable:
+                    self._reader = self._open()
+                    self._unavailable = self._reader is None
+        return self._reader
+
+    def _open(self):
+        if not self.path:
+            return None
+        if maxminddb is None:
+            logger.warning("GEOIP_DATABASE is set but maxminddb is not installed; skipping GeoIP lookups")
+            return None
+        try:
+            return maxminddb.open_database(str(self.path), maxminddb.MODE_MMAP)
+        except (OSError, ValueError):
+            logger.exception("Could not open GeoIP database %s", self.path)
+            return None
+
+    def lookup(self, ip):
+        """Return (country, city) for an address; empty strings when unknown."""
+        reader = self.reader
+        key = network_key(ip)
+        if reader is None or key is None:
+            return '', ''
+
+        with self._lock:
+            location = self._cache.get(key)
+            if location is not None:
+                self._cache.move_to_end(key)
+                return location
+
+        try:
+            record = reader.get(str(key.network_address)) or {}
+        except ValueError:
+            record = {}
+        location = (
+            self._name(record.get('country'))[:100],
+            self._name(record.get('city'))[:100],
+        )
+
+        with self._lock:
+            self._cache[key] = location
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return location
+
+    @staticmethod
+    def _name(entry):
+        return ((entry or {}).get('names') or {}).get('en', '')
+
+    def enrich(self, downloads):
+        """
+        Fill country and city on downloads that have no country yet.
+
+        Returns the downloads that were changed.
+        """
+        if self.reader is None:
+            return []
+        changed = []
+        for download in downloads:
+            if download.country:
+                continue
+            country, city = self.lookup(download.ip_address)
+            if country or city:
+                download.country, download.city = country, city
+                changed.append(download)
+        return changed
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+geoip = GeoIPResolver(
+    getattr(settings, 'GEOIP_DATABASE', None),
+    cache_size=getattr(settings, 'GEOIP_CACHE_SIZE', 4096),
+)
@@ -0,0 +1,19 @@
+"""
+Management command to rebuild the resume download rollups from the raw table.
+
+Migrations fill the rollups in when they are created; run this after
+deleting raw ResumeDownload rows outside the admin (which keeps the rollups
+up to date itself). Downloads written while it runs may be missed, so run
+it when traffic is quiet.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.analytics.models import DownloadRollup
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-day download rollups from all ResumeDownload rows'
+
+    def handle(self, *args, **options):
+        count = DownloadRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} download rollups'))
@@ -0,0 +1,63 @@
+"""
+Management command to parse the stored user agents of existing rows.
+
+Fills browser, os, device and is_bot on resume downloads and contact
+submissions in primary-key batches, classifying each distinct string once
+per batch, and rebuilds the download rollups so bot downloads move out of
+the totals. Rows that already have a device are skipped unless --all is
+given (e.g. after the rules in apps.core.utils.user_agent change).
+"""
+from django.core.management.base import BaseCommand
+
+from apps.analytics.models import DownloadRollup, ResumeDownload
+from apps.contact.models import ContactSubmission
+from apps.core.utils.user_agent import classify_many
+
+
+class Command(BaseCommand):
+    help = 'Classifies the user agents of resume downloads and contact submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows read and written per batch',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-classify rows that were already classified',
+        )
+
+    def handle(self, *args, **options):
+        downloads = self._classify(ResumeDownload, options)
+        submissions = self._classify(ContactSubmission, options)
+
+        if downloads:
+            rollups = DownloadRollup.rebuild()
+            self.stdout.write(f'Rebuilt {rollups} download rollups')
+        self.stdout.write(self.style.SUCCESS(
+            f'Classified {downloads} downloads and {submissions} contact submissions'
+        ))
+
+    def _classify(self, model, options):
+        fields = model.USER_AGENT_FIELDS
+        rows = model.objects.only('id', 'user_agent', *fields).order_by('pk')
+        if not options['all']:
+            rows = rows.filter(device='')
+
+        last_pk = 0
+        total = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            parsed = classify_many(row.user_agent for row in batch)
+            for row in batch:
+                row.classify_user_agent(parsed[row.user_agent])
+            model.objects.bulk_update(batch, fields)
+            total += len(batch)
+        return total
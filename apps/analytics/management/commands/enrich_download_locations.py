@@ -0,0 +1,63 @@
+"""
+Management command to fill country and city on existing resume downloads.
+
+Walks the table in primary-key order, resolves each batch against the local
+GeoIP database (see apps.analytics.geoip) and writes it back with
+bulk_update. Safe to re-run: rows that already have a country are skipped
+unless --all is given.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.geoip import geoip
+from apps.analytics.models import ResumeDownload
+
+
+class Command(BaseCommand):
+    help = 'Resolves country and city for resume downloads from the local GeoIP database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows read and written per batch',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-resolve rows that already have a location',
+        )
+
+    def handle(self, *args, **options):
+        if geoip.reader is None:
+            raise CommandError('No usable GeoIP database; set GEOIP_DATABASE and install maxminddb')
+
+        batch_size = options['batch_size']
+        downloads = ResumeDownload.objects.only('id', 'ip_address', 'country', 'city').order_by('pk')
+        if not options['all']:
+            downloads = downloads.filter(country='')
+
+        last_pk = 0
+        scanned = updated = 0
+        while True:
+            batch = list(downloads.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            if options['all']:
+                # Compare with what was stored, so rows that no longer
+                # resolve get their old location cleared too
+                original = {download.pk: (download.country, download.city) for download in batch}
+                for download in batch:
+                    download.country = download.city = ''
+                geoip.enrich(batch)
+                changed = [d for d in batch if (d.country, d.city) != original[d.pk]]
+            else:
+                changed = geoip.enrich(batch)
+            if changed:
+                ResumeDownload.objects.bulk_update(changed, ['country', 'city'])
+                updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} of {scanned} downloads'))
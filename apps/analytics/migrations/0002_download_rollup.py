@@ -0,0 +1,56 @@
+# Generated by Django 4.2.27 on 2026-10-18 20:59
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+from apps.analytics.sketch import HyperLogLog
+
+
+def fill_rollups(apps, schema_editor):
+    """Roll up the downloads recorded so far, so the admin totals start complete."""
+    ResumeDownload = apps.get_model('analytics', 'ResumeDownload')
+    DownloadRollup = apps.get_model('analytics', 'DownloadRollup')
+    buckets = defaultdict(lambda: [0, HyperLogLog()])
+    rows = ResumeDownload.objects.order_by().values_list('created_at', 'download_source', 'ip_address')
+    for created_at, source, ip_address in rows.iterator(chunk_size=2000):
+        bucket = buckets[(timezone.localdate(created_at), source)]
+        bucket[0] += 1
+        bucket[1].add(ip_address)
+    DownloadRollup.objects.bulk_create(
+        DownloadRollup(day=day, download_source=source, downloads=count, visitors=sketch.to_bytes())
+        for (day, source), (count, sketch) in buckets.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DownloadRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('download_source', models.CharField(choices=[('modal', 'Resume Modal'), ('direct', 'Direct Link'), ('navbar', 'Navbar')], max_length=50)),
+                ('downloads', models.PositiveIntegerField(default=0)),
+                ('visitors', models.BinaryField(default=b'', help_text='HyperLogLog sketch of IP addresses')),
+            ],
+            options={
+                'verbose_name': 'Download Rollup',
+                'verbose_name_plural': 'Download Rollups',
+                'ordering': ['-day', 'download_source'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='downloadrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'download_source'), name='unique_download_rollup'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_download_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='downloadrollup',
+            name='bots',
+            field=models.PositiveIntegerField(default=0, help_text='Downloads by crawlers and scripts'),
+        ),
+        migrations.AddField(
+            model_name='resumedownload',
+            name='browser',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='resumedownload',
+            name='device',
+            field=models.CharField(blank=True, choices=[('desktop', 'Desktop'), ('mobile', 'Mobile'), ('tablet', 'Tablet'), ('bot', 'Bot')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='resumedownload',
+            name='is_bot',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='resumedownload',
+            name='os',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_user_agent_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resumedownload',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
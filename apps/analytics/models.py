@@ -1,13 +1,29 @@
 """
 Analytics models for tracking user interactions.
 """
-from django.db import models
-from apps.core.models import TimeStampedModel
+from collections import defaultdict
+from datetime import timedelta
 
+from django.db import models, transaction
+from django.utils import timezone
 
-class ResumeDownload(TimeStampedModel):
+from apps.core.models import TimeStampedModel, UserAgentModel
+from .sketch import HyperLogLog
+
+
+DOWNLOAD_SOURCE_CHOICES = [
+    ('modal', 'Resume Modal'),
+    ('direct', 'Direct Link'),
+    ('navbar', 'Navbar'),
+]
+
+
+class ResumeDownload(TimeStampedModel, UserAgentModel):
     """Track resume downloads for analytics."""
     
+    # Set when the download happens, not when its queued row is written
+    created_at = models.DateTimeField(default=timezone.now)
+    
     # Request information
     ip_address = models.GenericIPAddressField(help_text="IP address of downloader")
     user_agent = models.TextField(blank=True, help_text="Browser/device information")
@@ -20,11 +36,7 @@ class ResumeDownload(TimeStampedModel):
     # Download context
     download_source = models.CharField(
         max_length=50,
-        choices=[
-            ('modal', 'Resume Modal'),
-            ('direct', 'Direct Link'),
-            ('navbar', 'Navbar'),
-        ],
+        choices=DOWNLOAD_SOURCE_CHOICES,
         default='modal',
         help_text="Where the download was initiated"
     )
@@ -62,3 +74,126 @@ class ResumeDownload(TimeStampedModel):
     def get_recent_downloads(cls, limit=10):
         """Get most recent downloads."""
         return cls.objects.all()[:limit]
+
+
+class DownloadRollup(TimeStampedModel):
+    """
+    Resume downloads pre-aggregated per day and source.
+
+    Kept up to date as download batches are written (see tracking.py), so
+    the admin summary reads a few rows per day instead of scanning the raw
+    table. ``visitors`` is a HyperLogLog sketch of the IP addresses; sketches
+    merge, so unique visitors over any range are estimated from the rollups
+    alone. Bot downloads are only counted in ``bots``. Deleting rows in the
+    admin rebuilds the affected days; after deleting raw rows any other way,
+    rebuild with ``manage.py backfill_download_rollups``.
+    """
+
+    day = models.DateField()
+    download_source = models.CharField(max_length=50, choices=DOWNLOAD_SOURCE_CHOICES)
+    downloads = models.PositiveIntegerField(default=0)
+    bots = models.PositiveIntegerField(default=0, help_text="Downloads by crawlers and scripts")
+    visitors = models.BinaryField(default=b'', help_text="HyperLogLog sketch of IP addresses")
+
+    class Meta:
+        ordering = ['-day', 'download_source']
+        verbose_name = 'Download Rollup'
+        verbose_name_plural = 'Download Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'download_source'], name='unique_download_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.download_source}: {self.downloads}"
+
+    @staticmethod
+    def aggregate(rows):
+        """
+        Group (created_at, download_source, ip_address, is_bot) rows into
+        {(day, source): [downloads, bots, sketch]}.
+        """
+        buckets = defaultdict(lambda: [0, 0, HyperLogLog()])
+        for created_at, source, ip_address, is_bot in rows:
+            bucket = buckets[(timezone.localdate(created_at), source)]
+            if is_bot:
+                bucket[1] += 1
+            else:
+                bucket[0] += 1
+                bucket[2].add(ip_address)
+        return buckets
+
+    @classmethod
+    def add_downloads(cls, downloads):
+        """Fold newly saved ResumeDownload rows into their rollups."""
+        buckets = cls.aggregate(
+            (download.created_at, download.download_source, download.ip_address, download.is_bot)
+            for download in downloads
+        )
+        with transaction.atomic():
+            for (day, source), (count, bots, sketch) in buckets.items():
+                rollup, _ = cls.objects.select_for_update().get_or_create(day=day, download_source=source)
+                rollup.downloads += count
+                rollup.bots += bots
+                rollup.visitors = sketch.merge(HyperLogLog.from_bytes(rollup.visitors)).to_bytes()
+                rollup.save(update_fields=['downloads', 'bots', 'visitors', 'updated_at'])
+
+    @classmethod
+    def rebuild(cls, days=None):
+        """
+        Recompute the rollups from the raw table: all of them, or only those
+        of ``days`` (dates). Returns the number of rollups written.
+        """
+        rows = ResumeDownload.objects.all()
+        rollups = cls.objects.all()
+        if days is not None:
+            rows = rows.filter(created_at__date__in=days)
+            rollups = rollups.filter(day__in=days)
+        rows = rows.order_by().values_list('created_at', 'download_source', 'ip_address', 'is_bot')
+        buckets = cls.aggregate(rows.iterator(chunk_size=2000))
+        with transaction.atomic():
+            rollups.delete()
+            cls.objects.bulk_create(
+                cls(day=day, download_source=source, downloads=count, bots=bots, visitors=sketch.to_bytes())
+                for (day, source), (count, bots, sketch) in buckets.items()
+            )
+        return len(buckets)
+
+    @classmethod
+    def get_bot_downloads(cls):
+        return cls.objects.aggregate(total=models.Sum('bots'))['total'] or 0
+
+    @classmethod
+    def get_total_downloads(cls):
+        return cls.objects.aggregate(total=models.Sum('downloads'))['total'] or 0
+
+    @classmethod
+    def get_unique_visitors(cls, since=None):
+        """Estimated number of distinct IP addresses, optionally from ``since`` (a date) on."""
+        rollups = cls.objects.all()
+        if since is not None:
+            rollups = rollups.filter(day__gte=since)
+        merged = HyperLogLog()
+        for visitors in rollups.order_by().values_list('visitors', flat=True).iterator():
+            if visitors:
+                merged.merge(HyperLogLog.from_bytes(visitors))
+        return merged.count()
+
+    @classmethod
+    def get_downloads_by_source(cls):
+        """Download counts grouped by source."""
+        return cls.objects.values('download_source').annotate(
+            count=models.Sum('downloads')
+        ).order_by('-count')
+
+    @classmethod
+    def get_daily_trend(cls, days=30):
+        """List of (day, downloads) for the last ``days`` days, oldest first, zeros included."""
+        today = timezone.localdate()
+        start = today - timedelta(days=days - 1)
+        totals = dict(
+            cls.objects.filter(day__gte=start)
+            .values('day')
+            .annotate(total=models.Sum('downloads'))
+            .values_list('day', 'total')
+        )
+        return [(start + timedelta(days=i), totals.get(start + timedelta(days=i), 0)) for i in range(days)]
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .models import DownloadRollup, ResumeDownload
+from .sketch import HyperLogLog
+
+
+def sketch_of(values):
+    sketch = HyperLogLog()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+class HyperLogLogTests(SimpleTestCase):
+
+    def test_empty_sketch_counts_zero(self):
+        self.assertEqual(HyperLogLog().count(), 0)
+
+    def test_repeated_values_count_once(self):
+        self.assertEqual(sketch_of(['10.0.0.1'] * 50).count(), 1)
+
+    def test_estimate_error_at_small_counts(self):
+        for n in (1, 10, 100, 1000, 5000):
+            estimate = sketch_of(f'10.0.{i // 256}.{i % 256}' for i in range(n)).count()
+            self.assertLessEqual(abs(estimate - n), max(1, n * 0.03), f'{estimate} for {n}')
+
+    def test_merge_is_the_sketch_of_the_union(self):
+        first = sketch_of(range(0, 600))
+        second = sketch_of(range(400, 1000))
+        merged = first.merge(second)
+        self.assertEqual(merged.to_bytes(), sketch_of(range(1000)).to_bytes())
+
+    def test_bytes_round_trip(self):
+        sketch = sketch_of(range(300))
+        self.assertEqual(HyperLogLog.from_bytes(sketch.to_bytes()).count(), sketch.count())
+        self.assertEqual(HyperLogLog.from_bytes(b'').count(), 0)
+
+    def test_wrong_register_count_is_rejected(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog(b'\x00' * 10)
+
+
+class DownloadRollupTests(TestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+
+    def download(self, day, ip_address, source='modal', is_bot=False):
+        created_at = timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=12))
+        return ResumeDownload.objects.create(
+            ip_address=ip_address, download_source=source, is_bot=is_bot, created_at=created_at,
+        )
+
+    def test_rebuild_aggregates_per_day_and_source(self):
+        self.download(self.today, '10.0.0.1')
+        self.download(self.today, '10.0.0.1')
+        self.download(self.today, '10.0.0.2', source='navbar')
+        self.download(self.today, '10.0.0.3', is_bot=True)
+        self.download(self.yesterday, '10.0.0.4')
+
+        self.assertEqual(DownloadRollup.rebuild(), 3)
+
+        modal = DownloadRollup.objects.get(day=self.today, download_source='modal')
+        self.assertEqual((modal.downloads, modal.bots), (2, 1))
+        self.assertEqual(HyperLogLog.from_bytes(modal.visitors).count(), 1)
+        self.assertEqual(DownloadRollup.get_total_downloads(), 4)
+        self.assertEqual(DownloadRollup.get_unique_visitors(), 3)
+
+    def test_rebuilding_a_day_leaves_other_days_alone(self):
+        first = self.download(self.today, '10.0.0.1')
+        self.download(self.today, '10.0.0.2')
+        self.download(self.yesterday, '10.0.0.3')
+        DownloadRollup.rebuild()
+        DownloadRollup.objects.filter(day=self.yesterday).update(downloads=99)
+
+        first.delete()
+        DownloadRollup.rebuild(days=[self.today])
+
+        self.assertEqual(DownloadRollup.objects.get(day=self.today).downloads, 1)
+        self.assertEqual(DownloadRollup.objects.get(day=self.yesterday).downloads, 99)
+
+    def test_rebuilding_an_emptied_day_removes_its_rollups(self):
+        download = self.download(self.today, '10.0.0.1')
+        DownloadRollup.rebuild()
+        download.delete()
+        DownloadRollup.rebuild(days=[self.today])
+        self.assertFalse(DownloadRollup.objects.filter(day=self.today).exists())
+
+
+class RollupBackfillMigrationTests(TransactionTestCase):
+    """Migration 0002 rolls up the downloads recorded before it."""
+
+    migrate_from = [('analytics', '0001_initial')]
+    migrate_to = [('analytics', '0002_download_rollup')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_existing_downloads_are_rolled_up(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        old_apps = executor.loader.project_state(self.migrate_from).apps
+        OldDownload = old_apps.get_model('analytics', 'ResumeDownload')
+        OldDownload.objects.create(ip_address='10.0.0.1', download_source='modal')
+        OldDownload.objects.create(ip_address='10.0.0.1', download_source='modal')
+        OldDownload.objects.create(ip_address='10.0.0.2', download_source='direct')
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        new_apps = executor.loader.project_state(self.migrate_to).apps
+        Rollup = new_apps.get_model('analytics', 'DownloadRollup')
+
+        rollups = {rollup.download_source: rollup for rollup in Rollup.objects.all()}
+        self.assertEqual(rollups['modal'].downloads, 2)
+        self.assertEqual(rollups['direct'].downloads, 1)
+        self.assertEqual(HyperLogLog.from_bytes(rollups['modal'].visitors).count(), 1)
@@ -0,0 +1,112 @@
+"""
+Background ingestion of resume download events.
+
+The download view only appends an event to an in-process queue. A background
+flusher writes queued events with bulk_create when a batch fills up or every
+RESUME_DOWNLOAD_FLUSH_INTERVAL seconds, and whatever is left when the worker
+shuts down. ``created_at`` is the time the download was recorded, so events
+held back by a slow or failed flush still land on the right day.
+
+The queue is bounded by RESUME_DOWNLOAD_QUEUE_LIMIT: if the database falls
+behind, the oldest events are dropped (and counted) rather than growing
+memory without limit. A batch the database rejects (a value too long for
+its column, say) is saved again a row at a time, and rows that still fail
+are logged and dropped, so one bad event can't jam the queue.
+
+Each batch gets its user agents classified and its addresses resolved
+against the local GeoIP database (see geoip.py), and also updates the
+per-day DownloadRollup rows the admin reads.
+"""
+import logging
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError, DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from apps.core.utils.dedup import RecentEvents
+from apps.core.utils.flusher import PeriodicFlusher
+from .geoip import geoip
+from .models import DownloadRollup, ResumeDownload
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadQueue(PeriodicFlusher):
+    """Bounded queue of unsaved ResumeDownload rows."""
+
+    def __init__(self, interval, batch_size, limit):
+        super().__init__(interval)
+        self.batch_size = batch_size
+        self._events = deque(maxlen=limit)
+        self.dropped = 0
+
+    def record(self, **fields):
+        """Queue a download; takes the same fields as ResumeDownload."""
+        event = ResumeDownload(created_at=timezone.now(), **fields)
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            batch_full = len(self._events) >= self.batch_size
+        self.schedule(immediate=batch_full)
+
+    def take(self):
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    def write(self, events):
+        for event in events:
+            if not event.device:
+                event.classify_user_agent()
+        geoip.enrich(events)
+        try:
+            self._save(events)
+        except (DataError, IntegrityError):
+            # One bad row fails the whole batch: save the rows one at a time
+            # and drop those that still fail rather than retrying them forever
+            logger.exception("Resume download batch rejected; saving it row by row")
+            for i, event in enumerate(events):
+                event.pk = None
+                try:
+                    self._save([event])
+                except (DataError, IntegrityError):
+                    logger.exception("Dropping resume download from %s that can't be saved", event.ip_address)
+                except DatabaseError:
+                    # Lost the database; the rest goes out with the next flush
+                    logger.exception("%s failed to write buffered data", type(self).__name__)
+                    self.restore(events[i:])
+                    break
+        if self.dropped:
+            logger.warning("Resume download queue overflowed; %d events dropped so far", self.dropped)
+
+    def _save(self, events):
+        # Rows and rollups commit together, so a retried batch isn't counted twice
+        with transaction.atomic():
+            ResumeDownload.objects.bulk_create(events, batch_size=self.batch_size)
+            DownloadRollup.add_downloads(events)
+
+    def restore(self, events):
+        with self._lock:
+            # Failed events go back in front; keep the newest that still fit
+            room = self._events.maxlen - len(self._events)
+            keep = events[len(events) - room:] if room < len(events) else events
+            self.dropped += len(events) - len(keep)
+            for event in keep:
+                # bulk_create may have assigned ids before the rollback
+                event.pk = None
+            self._events.extendleft(reversed(keep))
+
+
+download_queue = DownloadQueue(
+    interval=getattr(settings, 'RESUME_DOWNLOAD_FLUSH_INTERVAL', 5),
+    batch_size=getattr(settings, 'RESUME_DOWNLOAD_BATCH_SIZE', 100),
+    limit=getattr(settings, 'RESUME_DOWNLOAD_QUEUE_LIMIT', 10000),
+)
+
+# Repeat downloads by the same visitor within EVENT_DEDUP_WINDOW are dropped
+recent_downloads = RecentEvents(
+    window=getattr(settings, 'EVENT_DEDUP_WINDOW', 30),
+    max_keys=getattr(settings, 'EVENT_DEDUP_MAX_KEYS', 20000),
+)
@@ -1,10 +1,13 @@
 """
 Views for analytics tracking.
 """
+import ipaddress
+
 from django.http import FileResponse, Http404
 from django.views import View
 from django.conf import settings
-from .models import ResumeDownload
+from .models import DOWNLOAD_SOURCE_CHOICES
+from .tracking import download_queue, recent_downloads
 from apps.core.models import SiteSettings
 
 
@@ -12,33 +15,51 @@ def get_client_ip(request):
     """Get client IP address from request."""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        ip = x_forwarded_for.split(',')[0].strip()
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
 
+def download_source(request):
+    """The ``source`` query parameter if it is a known source, else 'direct'."""
+    source = request.GET.get('source', 'direct')
+    return source if source in dict(DOWNLOAD_SOURCE_CHOICES) else 'direct'
+
+
+def is_valid_ip(ip):
+    """Check an address before it is queued, so a bad one can't fail a whole batch."""
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return True
+
+
 class ResumeDownloadView(View):
     """Handle resume downloads with analytics tracking."""
     
     def get(self, request):
         """Serve resume file and track download."""
         try:
-            site = SiteSettings.objects.first()
+            site = SiteSettings.load_cached()
             if not site or not site.resume_file:
                 raise Http404("Resume not found")
             
-            # Track the download
-            ResumeDownload.objects.create(
-                ip_address=get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                referrer=request.META.get('HTTP_REFERER', ''),
-                download_source=request.GET.get('source', 'direct')
-            )
+            # Track the download (written in the background, see tracking.py)
+            ip_address = get_client_ip(request)
+            user_agent = request.META.get('HTTP_USER_AGENT', '')
+            if is_valid_ip(ip_address) and not recent_downloads.seen(ip_address, user_agent, 'resume'):
+                download_queue.record(
+                    ip_address=ip_address,
+                    user_agent=user_agent,
+                    referrer=request.META.get('HTTP_REFERER', '')[:500],
+                    download_source=download_source(request)
+                )
             
-            # Serve the file
+            # Serve the file (open through storage: the cached site instance is shared)
             response = FileResponse(
-                site.resume_file.open('rb'),
+                site.resume_file.storage.open(site.resume_file.name, 'rb'),
                 content_type='application/pdf'
             )
             response['Content-Disposition'] = f'attachment; filename="{site.full_name}_Resume.pdf"'
@@ -1,23 +1,24 @@
 from django.contrib import admin
-from adminsortable2.admin import SortableAdminMixin
+from apps.core.admin_mixins import SortableContentAdminMixin
 from .models import BlogPost
 
 
 @admin.register(BlogPost)
-class BlogPostAdmin(SortableAdminMixin, admin.ModelAdmin):
+class BlogPostAdmin(SortableContentAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'author', 'published_date', 'is_published', 'is_featured', 'views', 'order')
     list_filter = ('is_published', 'is_featured', 'published_date', 'created_at')
     search_fields = ('title', 'excerpt', 'content', 'tags')
     list_editable = ('is_published', 'is_featured')
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'published_date'
+    readonly_fields = ('read_time', 'word_count', 'views')
     
     fieldsets = (
         ('Content', {
             'fields': ('title', 'slug', 'excerpt', 'content', 'cover_image', 'external_url', 'platform_name')
         }),
         ('Metadata', {
-            'fields': ('author', 'published_date', 'tags', 'read_time')
+            'fields': ('author', 'published_date', 'tags', 'read_time', 'word_count')
         }),
         ('Publishing', {
             'fields': ('is_published', 'is_featured', 'order')
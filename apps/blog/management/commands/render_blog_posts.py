@@ -0,0 +1,45 @@
+"""
+Management command to re-render the stored HTML of every blog post.
+
+Run it after changing the markdown extensions or the rendering code, or to
+fill in posts created before content was rendered on save.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.blog.models import BlogPost
+from apps.core.cache import bump_content_version
+
+
+class Command(BaseCommand):
+    help = 'Re-renders content_html, toc_html, word_count and read_time for all blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of posts written per UPDATE batch',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+
+        for post in BlogPost.objects.only('id', 'content').iterator(chunk_size=batch_size):
+            post.render_content()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                total += self._flush(batch)
+        total += self._flush(batch)
+
+        # bulk_update sends no post_save, so cached pages need a manual bump
+        bump_content_version(BlogPost)
+        self.stdout.write(self.style.SUCCESS(f'Rendered {total} blog posts'))
+
+    def _flush(self, batch):
+        count = len(batch)
+        if batch:
+            BlogPost.objects.bulk_update(batch, BlogPost.RENDERED_FIELDS)
+            batch.clear()
+        return count
@@ -1,15 +1,31 @@
+import math
+
 from django.db import models
+from django.utils.html import strip_tags
 from django.utils.text import slugify
 from django.urls import reverse
-import markdown
+from apps.core.utils.markdown_renderer import render_document
 
 
 class BlogPost(models.Model):
     """Blog posts showcasing knowledge and writing."""
+    
+    # Average adult reading speed, used for read_time
+    WORDS_PER_MINUTE = 200
+    
+    # Fields filled in by render_content()
+    RENDERED_FIELDS = ('content_html', 'toc_html', 'word_count', 'read_time')
+    
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     excerpt = models.TextField(max_length=300, help_text="Short description for previews")
     content = models.TextField(help_text="Full blog post content (supports Markdown)")
+    
+    # Rendered from content on save (see render_content)
+    content_html = models.TextField(blank=True, editable=False)
+    toc_html = models.TextField(blank=True, editable=False, help_text="Table of contents built from headings")
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    
     cover_image = models.ImageField(upload_to='blog/', blank=True, null=True, help_text="Featured image")
     external_url = models.URLField(blank=True, help_text="Link to externally published blog (e.g., Medium, Dev.to)")
     platform_name = models.CharField(max_length=50, blank=True, help_text="Platform name for external link (e.g., Medium, Dev.to)")
@@ -23,7 +39,7 @@ class BlogPost(models.Model):
     
     # SEO
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
-    read_time = models.IntegerField(default=5, help_text="Estimated reading time in minutes")
+    read_time = models.IntegerField(default=5, help_text="Estimated reading time in minutes (calculated on save)")
     views = models.IntegerField(default=0, help_text="Number of views")
     order = models.IntegerField(default=0, help_text="Display order (lower first)")
     
@@ -37,8 +53,19 @@ class BlogPost(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.RENDERED_FIELDS}
         super().save(*args, **kwargs)
     
+    def render_content(self):
+        """Render the markdown content and update the derived fields."""
+        self.content_html, self.toc_html = render_document(self.content)
+        self.word_count = len(strip_tags(self.content_html).split())
+        self.read_time = max(1, math.ceil(self.word_count / self.WORDS_PER_MINUTE))
+    
     def __str__(self):
         return self.title
     
@@ -49,8 +76,7 @@ class BlogPost(models.Model):
         return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
     
     def get_content_as_html(self):
-        """Convert markdown content to HTML."""
-        return markdown.markdown(
-            self.content,
-            extensions=['extra', 'codehilite', 'nl2br', 'sane_lists']
-        )
+        """Return the HTML rendered on save (renders now for posts saved before that existed)."""
+        if not self.content_html and self.content:
+            return render_document(self.content)[0]
+        return self.content_html
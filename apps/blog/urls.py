@@ -5,5 +5,6 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.BlogListView.as_view(), name='list'),
+    path('page/<int:page>/', views.BlogListView.as_view(), name='list_page'),
     path('<slug:slug>/', views.BlogDetailView.as_view(), name='detail'),
 ]
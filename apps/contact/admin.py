@@ -5,9 +5,9 @@ from .models import ContactSubmission
 @admin.register(ContactSubmission)
 class ContactSubmissionAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'subject', 'status', 'created_at')
-    list_filter = ('status', 'created_at')
+    list_filter = ('status', 'is_bot', 'created_at')
     list_editable = ('status',)
-    readonly_fields = ('created_at', 'ip_address', 'user_agent')
+    readonly_fields = ('created_at', 'ip_address', 'user_agent', 'browser', 'os', 'device', 'is_bot')
     
     def has_add_permission(self, request):
         return False
\ No newline at end of file
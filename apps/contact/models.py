@@ -3,10 +3,10 @@ Models for contact form submissions.
 """
 
 from django.db import models
-from apps.core.models import TimeStampedModel
+from apps.core.models import TimeStampedModel, UserAgentModel
 
 
-class ContactSubmission(TimeStampedModel):
+class ContactSubmission(TimeStampedModel, UserAgentModel):
     """Store contact form submissions."""
     
     STATUS_CHOICES = [
@@ -7,8 +7,9 @@ from django.urls import reverse_lazy
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
-from django.db import connection
+from apps.core.utils.schema import is_ready
 from .forms import ContactForm
+from .models import ContactSubmission
 
 
 class ContactView(FormView):
@@ -17,22 +18,15 @@ class ContactView(FormView):
     form_class = ContactForm
     success_url = reverse_lazy('contact:contact')
     
-    def _table_exists(self, table_name):
-        """Check if a database table exists using Django introspection."""
-        try:
-            table_names = connection.introspection.table_names()
-            return table_name in table_names
-        except Exception:
-            return False
-    
     def form_valid(self, form):
         try:
             # Only save if the table exists
-            if self._table_exists('contact_contactsubmission'):
+            if is_ready(ContactSubmission):
                 # Save submission
                 submission = form.save(commit=False)
                 submission.ip_address = self.get_client_ip()
                 submission.user_agent = self.request.META.get('HTTP_USER_AGENT', '')[:500]
+                submission.classify_user_agent()
                 submission.save()
             
             # Success message
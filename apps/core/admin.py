@@ -1,6 +1,7 @@
 from django.contrib import admin
-from adminsortable2.admin import SortableAdminMixin
-from .models import SiteSettings, Skill
+from .admin_mixins import SortableContentAdminMixin
+from .models import ImageAsset, SiteSettings, Skill
+from .utils.image_worker import image_worker
 
 
 @admin.register(SiteSettings)
@@ -39,7 +40,7 @@ class SiteSettingsAdmin(admin.ModelAdmin):
 
 
 @admin.register(Skill)
-class SkillAdmin(SortableAdminMixin, admin.ModelAdmin):
+class SkillAdmin(SortableContentAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'category', 'subcategory', 'details', 'order', 'is_active', 'is_featured')
     list_filter = ('category', 'subcategory', 'is_active', 'is_featured')
     list_editable = ('is_active', 'is_featured')
@@ -51,4 +52,29 @@ class SkillAdmin(SortableAdminMixin, admin.ModelAdmin):
         ('Display', {
             'fields': ('icon', 'order', 'is_active', 'is_featured')
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ImageAsset)
+class ImageAssetAdmin(admin.ModelAdmin):
+    """Status of the background image jobs."""
+    list_display = ('name', 'status', 'attempts', 'width', 'height', 'variant_count', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('name', 'field')
+    readonly_fields = ('name', 'field', 'status', 'attempts', 'last_error', 'width', 'height', 'variants', 'created_at', 'updated_at')
+    actions = ['retry_jobs']
+    
+    def variant_count(self, obj):
+        return len(obj.variants)
+    variant_count.short_description = 'Sizes'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Re-run image job')
+    def retry_jobs(self, request, queryset):
+        names = list(queryset.values_list('name', flat=True))
+        queryset.update(status=ImageAsset.STATUS_PENDING, attempts=0, last_error='')
+        for name in names:
+            image_worker.submit(name)
+        self.message_user(request, f'Queued {len(names)} image job(s).')
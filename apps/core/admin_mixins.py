@@ -0,0 +1,21 @@
+"""
+Shared admin mixins.
+"""
+from adminsortable2.admin import SortableAdminMixin
+
+from .cache import bump_content_version
+
+
+class SortableContentAdminMixin(SortableAdminMixin):
+    """
+    SortableAdminMixin for public content.
+
+    Drag & drop reordering is saved with bulk_update, which sends no model
+    signals, so the content version has to be bumped here.
+    """
+
+    def update_order(self, request):
+        response = super().update_order(request)
+        if response.status_code == 200:
+            bump_content_version(self.model)
+        return response
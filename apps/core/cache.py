@@ -0,0 +1,108 @@
+"""
+Content versioning and full-page caching helpers.
+
+Every public page is built from a handful of admin-edited models. Instead of
+tracking which page depends on which row, all cached pages share one content
+version that is bumped whenever any of those models changes. Old pages are
+never deleted, they simply stop being looked up and expire on their own.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Models whose changes invalidate every cached page (app_label.ModelName)
+CONTENT_MODELS = (
+    'core.SiteSettings',
+    'core.Skill',
+    'core.ImageAsset',
+    'projects.Project',
+    'projects.ProjectImage',
+    'experience.Experience',
+    'education.Education',
+    'education.Certification',
+    'testimonials.Testimonial',
+    'blog.BlogPost',
+)
+
+# Saves that only touch these fields don't change what pages show
+UNTRACKED_FIELDS = frozenset({'views'})
+
+# Query parameters that never change the rendered page
+IGNORED_QUERY_PREFIXES = ('utm_',)
+IGNORED_QUERY_PARAMS = frozenset({'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid'})
+
+CONTENT_VERSION_KEY = 'content:version'
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted key never reuses an old version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, None)
+        return version
+
+
+def model_version_key(model):
+    """Cache key of a single model's version; accepts a model or 'app_label.ModelName'."""
+    label = model if isinstance(model, str) else model._meta.label
+    return f'{CONTENT_VERSION_KEY}:{label.lower()}'
+
+
+def get_content_version():
+    """Return the current content version, creating it if needed."""
+    return _get_version(CONTENT_VERSION_KEY)
+
+
+def get_model_version(model):
+    """Return the version of one content model, for caches that depend on it alone."""
+    return _get_version(model_version_key(model))
+
+
+def bump_content_version(*models):
+    """Invalidate every versioned cache entry, and those tied to ``models``."""
+    for model in models:
+        _bump_version(model_version_key(model))
+    return _bump_version(CONTENT_VERSION_KEY)
+
+
+def normalized_query(query_dict):
+    """Return the query string with tracking parameters dropped and keys sorted."""
+    items = []
+    for key in sorted(query_dict):
+        if key in IGNORED_QUERY_PARAMS or key.startswith(IGNORED_QUERY_PREFIXES):
+            continue
+        for value in sorted(query_dict.getlist(key)):
+            items.append((key, value))
+    return urlencode(items)
+
+
+def page_cache_key(request, version=None):
+    """Build the cache key for a GET request at the given content version."""
+    if version is None:
+        version = get_content_version()
+    raw = '|'.join((
+        request.scheme,
+        request.get_host(),
+        request.path,
+        normalized_query(request.GET),
+    ))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'page:{version}:{digest}'
+
+
+def page_cache_timeout():
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60)
@@ -0,0 +1,81 @@
+"""
+Conditional GET support for public content pages.
+
+Validators are computed from the rows a page shows, without rendering it:
+the ETag covers each row's identity and timestamp (so additions, edits and
+deletions all change it) and Last-Modified is the newest timestamp. A client
+that only sends If-Modified-Since won't notice a deleted row until something
+else on the page changes; browsers send both headers.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import SiteSettings
+from .snapshot import get_snapshot
+from .utils.schema import is_ready
+
+
+def _timestamp(obj):
+    """Last change time of a row; some models only have created_at."""
+    return getattr(obj, 'updated_at', None) or getattr(obj, 'created_at', None)
+
+
+def content_validators(objects):
+    """Return (etag, last_modified) for the given model instances."""
+    digest = hashlib.md5()
+    last_modified = None
+    for obj in objects:
+        timestamp = _timestamp(obj)
+        digest.update(f'{obj._meta.label}:{obj.pk}:{timestamp.isoformat() if timestamp else ""};'.encode('utf-8'))
+        if timestamp and (last_modified is None or timestamp > last_modified):
+            last_modified = timestamp
+    return quote_etag(digest.hexdigest()), last_modified
+
+
+class ConditionalContentMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before rendering.
+
+    Views return the instances they display from get_validator_objects(),
+    or None to skip the check. Site settings and image assets are always
+    included.
+    """
+
+    def get_validator_objects(self):
+        raise NotImplementedError
+
+    def get_validators(self):
+        """Return (etag, last_modified timestamp) for this page, or None."""
+        objects = self.get_validator_objects()
+        if objects is None:
+            return None
+        if is_ready(SiteSettings):
+            objects = [SiteSettings.load_cached(), *objects]
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            # Regenerated image variants change the markup
+            objects = [*objects, *snapshot.image_assets.values()]
+
+        etag, last_modified = content_validators(objects)
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def dispatch(self, request, *args, **kwargs):
+        # Flash messages aren't part of the validators, so always render them
+        if request.method not in ('GET', 'HEAD') or 'messages' in request.COOKIES:
+            return super().dispatch(request, *args, **kwargs)
+
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+        return response
@@ -2,18 +2,17 @@
 Context processors for making data available across all templates.
 """
 
-from django.db import connection
 from .models import SiteSettings
+from .utils.schema import is_ready
 
 
 def site_data(request):
     """Add site settings to all template contexts."""
     try:
-        # Check if the table exists using Django introspection
-        table_names = connection.introspection.table_names()
-        if 'core_sitesettings' in table_names:
+        # Table may be missing on a fresh deploy before migrations run
+        if is_ready(SiteSettings):
             return {
-                'site': SiteSettings.load(),
+                'site': SiteSettings.load_cached(),
             }
         else:
             return {
@@ -23,4 +22,4 @@ def site_data(request):
         # If anything fails, return None
         return {
             'site': None,
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,72 @@
+"""
+Management command to record dimensions and placeholders for existing media.
+
+New uploads get their width and height when they are saved and their
+dominant color and blurred preview from the background image job. This
+fills in the same metadata for files uploaded before that: every file
+referenced from an ImageField without an ImageAsset row gets one (left
+'pending', so ``process_images`` also generates its variants), and rows
+missing metadata are updated. Files are only read, never re-encoded, and
+JPEGs are decoded at reduced scale, so it is much cheaper than
+reoptimize_images.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.core.cache import bump_content_version
+from apps.core.models import ImageAsset
+from apps.core.utils.image_derivatives import image_placeholder, referenced_images
+from apps.core.utils.image_optimizer import ImageOptimizer
+from apps.core.utils.image_worker import field_storage
+
+# Decode no larger than this; plenty for a 64px color sample
+SAMPLE_SIZE = (256, 256)
+
+
+class Command(BaseCommand):
+    help = 'Records dimensions, dominant color and a blurred preview for existing images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute metadata for every image, not just incomplete ones',
+        )
+
+    def handle(self, *args, **options):
+        assets = {asset.name: asset for asset in ImageAsset.objects.all()}
+        incomplete = set(
+            ImageAsset.objects.filter(Q(width__isnull=True) | Q(dominant_color=''))
+            .values_list('name', flat=True)
+        )
+
+        created = updated = failed = 0
+        for name, label in referenced_images():
+            asset = assets.get(name)
+            if asset is not None and not options['all'] and name not in incomplete:
+                continue
+            try:
+                with field_storage(label).open(name, 'rb') as f:
+                    source = ImageOptimizer.open_source(f, SAMPLE_SIZE, keep_alpha=True)
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"Failed {name}: {e}"))
+                continue
+
+            metadata = dict(zip(('dominant_color', 'placeholder'), image_placeholder(source.image)))
+            metadata['width'], metadata['height'] = source.size
+            if asset is None:
+                ImageAsset.objects.create(name=name, field=label, **metadata)
+                created += 1
+            else:
+                ImageAsset.objects.filter(pk=asset.pk).update(**metadata)
+                updated += 1
+
+        if created or updated:
+            # Queryset updates send no post_save
+            bump_content_version(ImageAsset)
+        self.stdout.write(self.style.SUCCESS(
+            f"{created} images added, {updated} updated, {failed} failed"
+        ))
+        if created:
+            self.stdout.write("Run 'manage.py process_images' to generate their variants.")
@@ -0,0 +1,125 @@
+"""
+Management command to benchmark responsive variant generation.
+
+Times the old approach (every variant decodes the full-size original and
+shrinks it with a single LANCZOS pass) against the current one (decode once
+at reduced scale, resize every size from that frame) on the same inputs,
+and compares the output with a simple per-pixel error so a speedup never
+hides a quality regression. Nothing is written to storage.
+
+Pass image paths to benchmark real uploads; without any, synthetic 24 and
+12 megapixel photos and a transparent PNG are generated.
+"""
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+from apps.core.utils.image_optimizer import ImageOptimizer
+
+
+def _synthetic_samples():
+    """Yield (label, bytes) for generated test images."""
+    for label, size in (('24MP JPEG', (6000, 4000)), ('12MP JPEG', (4000, 3000))):
+        img = Image.radial_gradient('L').resize(size).convert('RGB')
+        img = Image.merge('RGB', (img.getchannel(0), Image.linear_gradient('L').resize(size), img.getchannel(2)))
+        draw = ImageDraw.Draw(img)
+        for i in range(0, size[0], 97):
+            draw.line((i, 0, size[0] - i, size[1]), fill=(i % 255, 80, 160), width=3)
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=92)
+        yield label, output.getvalue()
+
+    logo = Image.new('RGBA', (2400, 2400), (0, 0, 0, 0))
+    ImageDraw.Draw(logo).ellipse((200, 200, 2200, 2200), fill=(30, 120, 200, 255))
+    output = BytesIO()
+    logo.save(output, format='PNG')
+    yield 'RGBA PNG', output.getvalue()
+
+
+def legacy_variants(data, alpha):
+    """The pre-fast-path pipeline: a full decode per size and format."""
+    outputs = {}
+    for size, box in ImageOptimizer.THUMBNAIL_SIZES.items():
+        for img_format in ('WEBP', 'PNG' if alpha else 'JPEG'):
+            img = Image.open(BytesIO(data))
+            img = ImageOptimizer.prepare_mode(img, keep_alpha=img_format != 'JPEG')
+            img.thumbnail(box, Image.Resampling.LANCZOS, reducing_gap=None)
+            outputs[size] = img
+            ImageOptimizer.encode(img, img_format)
+    return outputs
+
+
+def fast_variants(data, alpha):
+    """The current pipeline, as used by generate_derivatives."""
+    outputs = {}
+    sizes = ImageOptimizer.THUMBNAIL_SIZES
+    source = ImageOptimizer.open_source(BytesIO(data), max(sizes.values()), keep_alpha=alpha)
+    for size, box in sizes.items():
+        img = ImageOptimizer.resize_to_fit(source.image, box)
+        outputs[size] = img
+        for img_format in ('WEBP', 'PNG' if alpha else 'JPEG'):
+            ImageOptimizer.encode(img, img_format)
+    return outputs
+
+
+def mean_error(a, b):
+    """Mean absolute difference per channel, 0-255."""
+    if a.size != b.size:
+        b = b.resize(a.size)
+    diff = ImageChops.difference(a.convert('RGB'), b.convert('RGB'))
+    return sum(ImageStat.Stat(diff).mean) / 3
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks responsive variant generation (old vs. current pipeline)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Images to benchmark (default: synthetic samples)')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per image; the fastest is reported',
+        )
+
+    def handle(self, *args, **options):
+        if options['paths']:
+            samples = []
+            for path in options['paths']:
+                with open(path, 'rb') as f:
+                    samples.append((path, f.read()))
+        else:
+            samples = _synthetic_samples()
+
+        totals = [0.0, 0.0]
+        for label, data in samples:
+            with Image.open(BytesIO(data)) as img:
+                alpha = ImageOptimizer.has_alpha(img)
+                size = img.size
+
+            legacy_time, legacy_out = self._time(legacy_variants, data, alpha, options['repeat'])
+            fast_time, fast_out = self._time(fast_variants, data, alpha, options['repeat'])
+            totals[0] += legacy_time
+            totals[1] += fast_time
+
+            error = max(mean_error(legacy_out[name], fast_out[name]) for name in fast_out)
+            self.stdout.write(
+                f"{label} ({size[0]}x{size[1]}): {legacy_time * 1000:.0f} ms -> {fast_time * 1000:.0f} ms "
+                f"({legacy_time / fast_time:.1f}x), max mean error {error:.2f}/255"
+            )
+
+        if totals[1]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Total: {totals[0]:.2f}s -> {totals[1]:.2f}s ({totals[0] / totals[1]:.1f}x faster)"
+            ))
+
+    def _time(self, func, data, alpha, repeat):
+        best, result = None, None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            result = func(data, alpha)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
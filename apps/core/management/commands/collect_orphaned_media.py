@@ -0,0 +1,181 @@
+"""
+Management command to delete media files nothing refers to any more.
+
+Replacing an image or the resume in the admin leaves the old file behind,
+and so do re-optimized originals and regenerated variants. This builds the
+set of referenced paths in one streamed pass over the database (every
+FileField and ImageField in the project's apps, plus the variants of the
+images they point at), then walks the directories those fields upload
+into, plus the image variants under derived/, with a thread pool so S3
+listings and lookups overlap, and deletes every file there that is not
+referenced and older than --grace-hours. Nothing outside those
+directories is looked at, so other files sharing the bucket are safe. The grace period protects uploads
+and image jobs still in flight. ImageAsset rows of images no field uses
+any more are deleted along with their files.
+
+Use --dry-run to only list what would be deleted.
+"""
+import posixpath
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+
+from apps.core.models import ImageAsset
+from apps.core.utils.image_derivatives import DERIVED_PREFIX
+
+
+def upload_dir(field):
+    """
+    Fixed directory ``field`` uploads into, or None if it can't be told (a
+    callable upload_to, or one that puts files at the storage root).
+    """
+    if callable(field.upload_to):
+        return None
+    # Dated paths like 'uploads/%Y/%m/' keep their fixed part
+    prefix = str(field.upload_to).split('%', 1)[0]
+    directory = prefix.rstrip('/') if prefix.endswith('/') else posixpath.dirname(prefix)
+    return directory or None
+
+
+def file_fields():
+    """Yield (model, [file fields]) for every model in the project's apps that has any."""
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('apps.'):
+            continue
+        for model in app_config.get_models():
+            fields = [f for f in model._meta.get_fields() if isinstance(f, models.FileField)]
+            if fields:
+                yield model, fields
+
+
+class Command(BaseCommand):
+    help = 'Deletes media files that no model refers to'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List orphaned files without deleting them',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=24,
+            help='Keep unreferenced files younger than this (default: 24)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Threads used to scan storage and delete files (default: 8)',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['grace_hours'])
+        dry_run = options['dry_run']
+        referenced, storages, stale_assets = self._referenced_files(cutoff)
+        self.stdout.write(f"{len(referenced)} files referenced")
+        total_files = total_bytes = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for storage, roots in storages:
+                orphans = self._find_orphans(pool, storage, roots, referenced, cutoff)
+                for name, size in sorted(orphans):
+                    self.stdout.write(f"{'Would delete' if dry_run else 'Deleting'} {name} ({filesizeformat(size)})")
+                if not dry_run:
+                    # list() to surface the first error
+                    list(pool.map(storage.delete, [name for name, _ in orphans]))
+                total_files += len(orphans)
+                total_bytes += sum(size for _, size in orphans)
+
+        if stale_assets and not dry_run:
+            ImageAsset.objects.filter(pk__in=stale_assets).delete()
+        self.stdout.write(
+            f"{len(stale_assets)} unused image records {'would be ' if dry_run else ''}removed"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_files} orphaned files, {filesizeformat(total_bytes)} "
+            + ('would be reclaimed' if dry_run else 'reclaimed')
+        ))
+
+    def _referenced_files(self, cutoff):
+        """
+        Return (set of referenced names, [(storage, directories to scan)],
+        pks of ImageAsset rows for images nothing uses any more).
+        """
+        referenced = set()
+        storages = {}
+        for model, fields in file_fields():
+            for field in fields:
+                storage, roots = storages.setdefault(id(field.storage), (field.storage, set()))
+                directory = upload_dir(field)
+                if directory is None:
+                    self.stderr.write(
+                        f"Skipping {model._meta.label}.{field.name}: no fixed upload directory to scan"
+                    )
+                else:
+                    roots.add(directory)
+                if isinstance(field, models.ImageField):
+                    roots.add(DERIVED_PREFIX)
+            rows = model._default_manager.values_list(*[f.name for f in fields]).iterator(chunk_size=2000)
+            for row in rows:
+                referenced.update(name for name in row if name)
+
+        stale = []
+        assets = ImageAsset.objects.values_list('pk', 'name', 'variants', 'updated_at').iterator(chunk_size=2000)
+        for pk, name, variants, updated_at in assets:
+            if name in referenced or updated_at > cutoff:
+                # In use, or a job may still be swapping it in
+                referenced.add(name)
+                referenced.update(ImageAsset(variants=variants).variant_names())
+            else:
+                stale.append(pk)
+        scans = [(storage, self._outermost(roots)) for storage, roots in storages.values()]
+        return referenced, scans, stale
+
+    @staticmethod
+    def _outermost(directories):
+        """Drop directories inside another one, which the walk covers anyway."""
+        kept = []
+        for directory in sorted(directories):
+            if not any(directory.startswith(parent + '/') for parent in kept):
+                kept.append(directory)
+        return kept
+
+    def _find_orphans(self, pool, storage, roots, referenced, cutoff):
+        """Walk ``roots`` in ``storage`` a directory per task; return [(name, size)] of orphans."""
+        orphans = []
+        pending = {pool.submit(self._scan_dir, storage, root, referenced, cutoff) for root in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                subdirs, found = future.result()
+                orphans.extend(found)
+                pending.update(
+                    pool.submit(self._scan_dir, storage, path, referenced, cutoff) for path in subdirs
+                )
+        return orphans
+
+    def _scan_dir(self, storage, path, referenced, cutoff):
+        try:
+            dirs, files = storage.listdir(path)
+        except FileNotFoundError:
+            # No media uploaded yet
+            return [], []
+
+        found = []
+        for filename in files:
+            if filename.startswith('.'):
+                continue
+            name = posixpath.join(path, filename) if path else filename
+            if name in referenced:
+                continue
+            # Only unreferenced files are looked up (a request each on S3)
+            if storage.get_modified_time(name) > cutoff:
+                continue
+            found.append((name, storage.size(name)))
+        return [posixpath.join(path, d) if path else d for d in dirs], found
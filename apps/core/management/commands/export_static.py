@@ -0,0 +1,162 @@
+"""
+Management command to pre-render the public site into static HTML files.
+
+Each page is written to <output>/<path>/index.html with .gz (and .br, if the
+brotli package is installed) siblings, so WhiteNoise or any plain file server
+can serve the read-only site without running Python. Static assets still come
+from collectstatic.
+
+A manifest of per-page ETags (computed from the content rows' timestamps, see
+apps.core.conditional) is kept in the output directory; later runs only
+re-render pages whose ETag changed and remove pages that no longer exist.
+Use --full after deploying template changes. Category-filtered project lists
+use query strings and stay dynamic.
+"""
+import json
+import math
+import os
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory
+from django.urls import resolve, reverse
+from whitenoise.compress import Compressor
+
+from apps.blog.views import BlogListView
+from apps.core.snapshot import get_snapshot
+from apps.projects.views import ProjectListView
+
+MANIFEST_NAME = '.export-manifest.json'
+
+
+class Command(BaseCommand):
+    help = 'Pre-renders every public page into static HTML (incremental by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=str(getattr(settings, 'STATIC_EXPORT_ROOT', Path(settings.BASE_DIR) / 'static_export')),
+            help='Directory to write the site to',
+        )
+        parser.add_argument(
+            '--base-url',
+            default=getattr(settings, 'STATIC_EXPORT_BASE_URL', 'http://localhost'),
+            help='Scheme and host the pages are rendered for (e.g. https://example.com)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-render every page, ignoring the manifest',
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options['output'])
+        base = urlsplit(options['base_url'])
+        if not base.scheme or not base.netloc:
+            raise CommandError(f"--base-url must look like https://example.com, got {options['base_url']!r}")
+
+        snapshot = get_snapshot()
+        if snapshot is None:
+            raise CommandError('Could not load site content from the database')
+
+        output.mkdir(parents=True, exist_ok=True)
+        manifest_path = output / MANIFEST_NAME
+        old_manifest = {} if options['full'] else self._read_manifest(manifest_path)
+
+        client = Client(HTTP_HOST=base.netloc)
+        factory = RequestFactory(HTTP_HOST=base.netloc)
+        secure = base.scheme == 'https'
+        compressor = Compressor(quiet=True)
+
+        manifest = {}
+        rendered = skipped = 0
+        for path in self._public_paths(snapshot):
+            etag = self._page_etag(factory, path, secure)
+            target = self._target(output, path)
+            if etag and old_manifest.get(path) == etag and target.exists():
+                manifest[path] = etag
+                skipped += 1
+                continue
+
+            response = client.get(path, secure=secure, STATIC_EXPORT=True)
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'Skipping {path}: HTTP {response.status_code}'))
+                continue
+
+            self._write(target, response.content, compressor)
+            manifest[path] = etag
+            rendered += 1
+            self.stdout.write(f'Rendered {path}')
+
+        removed = 0
+        for path in set(old_manifest) - set(manifest):
+            self._remove(self._target(output, path))
+            removed += 1
+
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported to {output}: {rendered} rendered, {skipped} unchanged, {removed} removed'
+        ))
+
+    def _public_paths(self, snapshot):
+        """Yield the URL path of every public page."""
+        yield reverse('core:landing')
+        yield reverse('core:about')
+
+        yield from self._list_paths('projects', len(snapshot.projects), ProjectListView.paginate_by)
+        for slug in snapshot.projects_by_slug:
+            yield reverse('projects:detail', kwargs={'slug': slug})
+
+        yield from self._list_paths('blog', len(snapshot.blog_posts), BlogListView.paginate_by)
+        for slug in snapshot.blog_posts_by_slug:
+            yield reverse('blog:detail', kwargs={'slug': slug})
+
+    def _list_paths(self, namespace, count, per_page):
+        yield reverse(f'{namespace}:list')
+        for page in range(2, math.ceil(count / per_page) + 1):
+            yield reverse(f'{namespace}:list_page', kwargs={'page': page})
+
+    def _page_etag(self, factory, path, secure):
+        """ETag the view would send for this page, without rendering it."""
+        match = resolve(path)
+        view_class = getattr(match.func, 'view_class', None)
+        if view_class is None or not hasattr(view_class, 'get_validators'):
+            return None
+        view = view_class(**getattr(match.func, 'view_initkwargs', {}))
+        view.setup(factory.get(path, secure=secure), *match.args, **match.kwargs)
+        validators = view.get_validators()
+        return validators[0] if validators else None
+
+    def _target(self, output, path):
+        return output / path.strip('/') / 'index.html'
+
+    def _write(self, target, content, compressor):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix('.html.tmp')
+        tmp.write_bytes(content)
+        os.replace(tmp, target)
+
+        # Drop old siblings; the compressor skips formats that don't pay off
+        for suffix in ('.gz', '.br'):
+            sibling = target.with_name(target.name + suffix)
+            if sibling.exists():
+                sibling.unlink()
+        compressor.compress(str(target))
+
+    def _remove(self, target):
+        for name in (target.name, target.name + '.gz', target.name + '.br'):
+            path = target.with_name(name)
+            if path.exists():
+                path.unlink()
+        try:
+            target.parent.rmdir()
+        except OSError:
+            pass  # Not empty (nested pages) or already gone
+
+    def _read_manifest(self, manifest_path):
+        try:
+            return json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            return {}
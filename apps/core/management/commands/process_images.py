@@ -0,0 +1,56 @@
+"""
+Management command to run outstanding image jobs in the foreground.
+
+Picks up jobs the background worker never finished: pending ones (e.g. the
+process restarted before they ran), ones stuck in 'processing' for longer
+than --stale-minutes (the worker died mid-job) and, with --retry-failed,
+ones that ran out of attempts.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.models import ImageAsset
+from apps.core.utils.image_worker import process_image
+
+
+class Command(BaseCommand):
+    help = 'Runs pending (and optionally failed) background image jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also re-run jobs that failed too many times',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=15,
+            help="Treat jobs 'processing' for longer than this as abandoned",
+        )
+
+    def handle(self, *args, **options):
+        stale = ImageAsset.objects.filter(
+            status=ImageAsset.STATUS_PROCESSING,
+            updated_at__lt=timezone.now() - timedelta(minutes=options['stale_minutes']),
+        )
+        stale.update(status=ImageAsset.STATUS_PENDING)
+        if options['retry_failed']:
+            ImageAsset.objects.filter(status=ImageAsset.STATUS_FAILED).update(
+                status=ImageAsset.STATUS_PENDING, attempts=0,
+            )
+
+        names = list(
+            ImageAsset.objects.filter(status=ImageAsset.STATUS_PENDING).values_list('name', flat=True)
+        )
+        done = 0
+        for name in names:
+            if process_image(name):
+                done += 1
+                self.stdout.write(f'Processed {name}')
+            else:
+                self.stdout.write(self.style.WARNING(f'Failed {name}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {done} of {len(names)} image jobs'))
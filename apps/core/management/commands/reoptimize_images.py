@@ -0,0 +1,196 @@
+"""
+Management command to re-optimize every stored image in parallel.
+
+Meant for media uploaded before images were optimized on upload. Every file
+referenced from an ImageField is run through ImageOptimizer.optimize_image
+and gets its responsive variants, on a process pool sized to the CPU count.
+Workers only touch storage; the parent process swaps references and records
+ImageAsset rows, so the database sees one writer.
+
+A file whose SHA-256 matches the hash recorded on its ready ImageAsset is
+skipped, so re-runs only do new or changed files. Progress is checkpointed
+to a JSON file as results arrive; an interrupted run picks up where it left
+off (use --restart to ignore the checkpoint).
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core.models import ImageAsset
+from apps.core.utils.image_derivatives import generate_derivatives, referenced_images
+from apps.core.utils.image_worker import field_storage, file_hash, optimize_file, swap_references
+
+# Write the checkpoint after this many results
+CHECKPOINT_EVERY = 20
+
+
+def _init_worker():
+    # Needed when the pool spawns instead of forking (macOS, Windows)
+    import django
+    django.setup()
+
+
+def reoptimize_file(name, label, known_hash):
+    """Process one file in a worker process. Returns a result dict (never raises)."""
+    started = time.monotonic()
+    result = {'name': name, 'label': label, 'status': 'failed', 'before': 0, 'after': 0, 'new_name': None}
+    try:
+        storage = field_storage(label)
+        digest = file_hash(storage, name)
+        if digest == known_hash:
+            result.update(status='skipped', hash=digest)
+            return result
+
+        new_name, before, after = optimize_file(storage, name, label)
+        target = new_name or name
+        derivatives = generate_derivatives(storage, target)
+        result.update(
+            status='processed',
+            new_name=new_name,
+            before=before,
+            after=after,
+            hash=file_hash(storage, target) if new_name else digest,
+            **derivatives._asdict(),
+        )
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    finally:
+        result['seconds'] = time.monotonic() - started
+    return result
+
+
+class Command(BaseCommand):
+    help = 'Re-optimizes all stored images and regenerates their variants on a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes (default: CPU count)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=str(Path(settings.BASE_DIR) / '.reoptimize_images.json'),
+            help='Progress file used to resume an interrupted run',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and start over',
+        )
+
+    def handle(self, *args, **options):
+        checkpoint_path = Path(options['checkpoint'])
+        done = {} if options['restart'] else self._read_checkpoint(checkpoint_path)
+
+        known = {
+            name: content_hash
+            for name, content_hash in ImageAsset.objects.filter(
+                status=ImageAsset.STATUS_READY
+            ).values_list('name', 'content_hash').iterator()
+        }
+        tasks = [(name, label) for name, label in referenced_images() if name not in done]
+        resumed = len(done)
+
+        stats = {'processed': 0, 'skipped': 0, 'failed': 0, 'before': 0, 'after': 0}
+        started = time.monotonic()
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options['jobs'], initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(reoptimize_file, name, label, known.get(name, ''))
+                for name, label in tasks
+            ]
+            for count, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                self._record(result, stats)
+                if result['status'] != 'failed':
+                    done[result['name']] = result.get('hash', '')
+                if count % CHECKPOINT_EVERY == 0:
+                    self._write_checkpoint(checkpoint_path, done)
+        self._write_checkpoint(checkpoint_path, done)
+
+        self._report(stats, resumed, time.monotonic() - started)
+        if not stats['failed'] and checkpoint_path.exists():
+            checkpoint_path.unlink()
+
+    def _record(self, result, stats):
+        """Apply one worker result to the database."""
+        name = result['name']
+        if result['status'] == 'skipped':
+            stats['skipped'] += 1
+            return
+        if result['status'] == 'failed':
+            stats['failed'] += 1
+            self.stdout.write(self.style.ERROR(f"Failed {name}: {result.get('error')}"))
+            return
+
+        final_name = name
+        if result['new_name']:
+            # Superseded files may be shared by identical uploads; they are
+            # left for collect_orphaned_media
+            if swap_references(name, result['new_name']):
+                final_name = result['new_name']
+            else:
+                # Replaced while we worked
+                stats['skipped'] += 1
+                return
+
+        ImageAsset.objects.update_or_create(
+            name=final_name,
+            defaults={
+                'field': result['label'],
+                'width': result['width'],
+                'height': result['height'],
+                'variants': result['variants'],
+                'dominant_color': result['dominant_color'],
+                'placeholder': result['placeholder'],
+                'content_hash': result['hash'],
+                'status': ImageAsset.STATUS_READY,
+                'last_error': '',
+            },
+        )
+        stats['processed'] += 1
+        stats['before'] += result['before']
+        stats['after'] += result['after']
+        self.stdout.write(
+            f"Processed {name}: {result['before'] / 1024:.0f} KB -> {result['after'] / 1024:.0f} KB "
+            f"in {result['seconds']:.2f}s"
+        )
+
+    def _report(self, stats, resumed, elapsed):
+        mb = 1024 * 1024
+        total = stats['processed'] + stats['skipped'] + stats['failed']
+        saved = stats['before'] - stats['after']
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['processed']} processed, {stats['skipped']} unchanged, {stats['failed']} failed"
+            + (f", {resumed} done in an earlier run" if resumed else '')
+        ))
+        if stats['before']:
+            self.stdout.write(
+                f"Saved {saved / mb:.1f} MB of {stats['before'] / mb:.1f} MB ({saved / stats['before']:.0%})"
+            )
+        if elapsed:
+            self.stdout.write(
+                f"{elapsed:.1f}s elapsed, {total / elapsed:.1f} files/s, "
+                f"{stats['before'] / mb / elapsed:.1f} MB/s"
+            )
+
+    def _read_checkpoint(self, path):
+        try:
+            return json.loads(path.read_text())['done']
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _write_checkpoint(self, path, done):
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'done': done}))
+        os.replace(tmp, path)
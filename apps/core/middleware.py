@@ -0,0 +1,102 @@
+"""
+Middleware for the core app.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import cc_delim_re, get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .cache import get_content_version, page_cache_key, page_cache_timeout
+
+
+class PageCacheMiddleware:
+    """
+    Full-page cache for anonymous GET requests to the public site.
+
+    Only views in PAGE_CACHE_NAMESPACES are cached. Keys include the content
+    version, so an admin save shows up on the next request. A hit returns
+    before the view runs and never touches the database. Responses that
+    read the session, use a CSRF token, add messages or vary on Cookie are
+    never stored.
+
+    A view class may define ``page_cache_hit(request, *args, **kwargs)`` to do
+    bookkeeping (e.g. counting a view) when its cached copy is served. Hits
+    answered with 304 from the stored ETag/Last-Modified skip the hook.
+    """
+
+    # Headers replayed on hits so conditional GETs still get a 304
+    VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.namespaces = frozenset(getattr(settings, 'PAGE_CACHE_NAMESPACES', ()))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        key = getattr(request, '_page_cache_key', None)
+        if key and self._is_cacheable_response(request, response):
+            validators = {name: response[name] for name in self.VALIDATOR_HEADERS if response.has_header(name)}
+            cache.set(key, (response.content, response['Content-Type'], validators), page_cache_timeout())
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self._is_cacheable_request(request):
+            return None
+
+        key = page_cache_key(request, get_content_version())
+        cached = cache.get(key)
+        if cached is None:
+            request._page_cache_key = key
+            return None
+
+        content, content_type, validators = cached
+        response = get_conditional_response(
+            request,
+            etag=validators.get('ETag'),
+            last_modified=parse_http_date_safe(validators.get('Last-Modified', '')),
+        )
+        if response is None:
+            view_class = getattr(view_func, 'view_class', None)
+            hook = getattr(view_class, 'page_cache_hit', None)
+            if hook is not None:
+                hook(request, *view_args, **view_kwargs)
+            response = HttpResponse(content, content_type=content_type)
+        for name, value in validators.items():
+            response[name] = value
+        response['X-Page-Cache'] = 'HIT'
+        return response
+
+    def _is_cacheable_request(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        match = request.resolver_match
+        if match is None or match.namespace not in self.namespaces:
+            return False
+        # A session or pending flash messages mean the page may be personalised
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or 'messages' in request.COOKIES:
+            return False
+        return True
+
+    def _is_cacheable_response(self, request, response):
+        if response.status_code != 200 or response.streaming:
+            return False
+        if response.cookies:
+            return False
+        # This runs before the session, CSRF and messages middleware add
+        # their cookies on the way out, so look at what the view used instead
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return False
+        session = getattr(request, 'session', None)
+        if session is not None and session.accessed:
+            return False
+        if getattr(getattr(request, '_messages', None), 'added_new', False):
+            return False
+        if 'cookie' in (header.lower() for header in cc_delim_re.split(response.get('Vary', ''))):
+            return False
+        cache_control = response.get('Cache-Control', '')
+        if 'private' in cache_control or 'no-store' in cache_control:
+            return False
+        return True
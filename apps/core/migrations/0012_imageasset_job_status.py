@@ -0,0 +1,46 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    """Rows from before the worker already have their variants."""
+    ImageAsset = apps.get_model('core', 'ImageAsset')
+    for asset in ImageAsset.objects.all():
+        asset.variants = {
+            size: {('fallback' if key == 'jpeg' else key): value for key, value in variant.items()}
+            for size, variant in asset.variants.items()
+        }
+        asset.status = 'ready'
+        asset.save(update_fields=['variants', 'status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_imageasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='field',
+            field=models.CharField(blank=True, help_text='Image field it was uploaded to (app_label.Model.field)', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_imageasset_job_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the original when it was last processed', max_length=64),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-18 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_imageasset_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageasset',
+            name='dominant_color',
+            field=models.CharField(blank=True, help_text='Most common color, as #rrggbb', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='imageasset',
+            name='placeholder',
+            field=models.TextField(blank=True, help_text='Tiny preview of the image as a data: URI'),
+        ),
+    ]
@@ -4,6 +4,8 @@ Core models for portfolio application.
 
 from django.db import models
 from django.core.validators import URLValidator
+from .cache import get_model_version
+from .utils.user_agent import DEVICE_CHOICES, classify
 
 
 class TimeStampedModel(models.Model):
@@ -18,6 +20,27 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+class UserAgentModel(models.Model):
+    """
+    Abstract base model for rows that store a raw ``user_agent``.
+    Adds the parsed browser, OS, device class and bot flag next to it.
+    """
+    browser = models.CharField(max_length=50, blank=True)
+    os = models.CharField(max_length=50, blank=True)
+    device = models.CharField(max_length=20, choices=DEVICE_CHOICES, blank=True)
+    is_bot = models.BooleanField(default=False, db_index=True)
+    
+    USER_AGENT_FIELDS = ('browser', 'os', 'device', 'is_bot')
+    
+    class Meta:
+        abstract = True
+    
+    def classify_user_agent(self, info=None):
+        """Fill the parsed fields from user_agent (or a precomputed UserAgentInfo)."""
+        info = info or classify(self.user_agent)
+        self.browser, self.os, self.device, self.is_bot = info
+
+
 class SiteSettings(TimeStampedModel):
     """
     Singleton model for site-wide settings.
@@ -61,6 +84,9 @@ class SiteSettings(TimeStampedModel):
     # Features
     enable_dark_mode = models.BooleanField(default=True)
     
+    # Process-local copy of the singleton as (version, instance), see load_cached()
+    _cached = None
+    
     class Meta:
         verbose_name = "Site Settings"
         verbose_name_plural = "Site Settings"
@@ -78,6 +104,23 @@ class SiteSettings(TimeStampedModel):
         """Load the singleton instance."""
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
+    
+    @classmethod
+    def load_cached(cls):
+        """
+        Load the singleton from the process-local cache.
+        
+        Saving the settings bumps their version in the shared cache (see
+        apps.core.signals), which makes every worker reload on its next call.
+        The returned instance is shared and must not be modified.
+        """
+        version = get_model_version(cls)
+        cached = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        obj = cls.load()
+        cls._cached = (version, obj)
+        return obj
 
 
 class Skill(TimeStampedModel):
@@ -135,4 +178,52 @@ class Skill(TimeStampedModel):
     
     def get_category_icon(self):
         """Get the icon for this skill's category."""
-        return self.CATEGORY_ICONS.get(self.category, '')
\ No newline at end of file
+        return self.CATEGORY_ICONS.get(self.category, '')
+
+class ImageAsset(TimeStampedModel):
+    """
+    Responsive variants of an uploaded image, keyed by its storage path.
+    One row per file referenced from any ImageField; also tracks the
+    background optimization job for the file (see utils.image_worker).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=255, unique=True, help_text="Storage path of the original")
+    field = models.CharField(max_length=100, blank=True, help_text="Image field it was uploaded to (app_label.Model.field)")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, help_text="SHA-256 of the original when it was last processed")
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # {'small': {'width': 480, 'height': 320, 'webp': '<path>', 'fallback': '<path>'}, ...}
+    variants = models.JSONField(default=dict, blank=True)
+    dominant_color = models.CharField(max_length=7, blank=True, help_text="Most common color, as #rrggbb")
+    # Painted behind the image while it loads; blank for transparent images
+    placeholder = models.TextField(blank=True, help_text="Tiny preview of the image as a data: URI")
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Image Asset"
+        verbose_name_plural = "Image Assets"
+    
+    def __str__(self):
+        return self.name
+    
+    def variant_names(self):
+        """Storage paths of every generated variant."""
+        return [
+            path
+            for variant in self.variants.values()
+            for key, path in variant.items()
+            if key in ('webp', 'fallback')
+        ]
@@ -1,38 +1,66 @@
 """
-Signal handlers for automatic image optimization.
+Signal handlers for the core app.
 """
-from django.db.models.signals import pre_save
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_migrate, pre_save
 from django.dispatch import receiver
-from .models import SiteSettings
-from .utils.image_optimizer import ImageOptimizer
-
-
-@receiver(pre_save, sender=SiteSettings)
-def optimize_site_images(sender, instance, **kwargs):
-    """Optimize profile image when SiteSettings is saved."""
-    if instance.profile_image:
-        try:
-            # Check if this is a new upload or changed image
-            if instance.pk:
-                try:
-                    old_instance = SiteSettings.objects.get(pk=instance.pk)
-                    if old_instance.profile_image == instance.profile_image:
-                        return  # Image hasn't changed
-                except SiteSettings.DoesNotExist:
-                    pass
-            
-            # Optimize the image
-            optimized = ImageOptimizer.optimize_image(
-                instance.profile_image,
-                max_width=500,  # Profile images don't need to be huge
-                max_height=500
-            )
-            
-            if optimized:
-                instance.profile_image.save(
-                    optimized.name,
-                    optimized,
-                    save=False
-                )
-        except Exception as e:
-            print(f"Error optimizing profile image: {e}")
+from .cache import CONTENT_MODELS, UNTRACKED_FIELDS, bump_content_version
+from .utils.image_derivatives import image_fields
+from .utils.image_worker import queue_instance_images, read_upload_dimensions
+from .utils.schema import schema_registry
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_migrate)
+def refresh_schema_registry(sender, **kwargs):
+    """Re-scan the table list once migrations have been applied."""
+    schema_registry.invalidate()
+    transaction.on_commit(lambda: bump_content_version(*CONTENT_MODELS))
+
+
+def invalidate_content(sender, update_fields=None, **kwargs):
+    """
+    Bump the content version when public content changes.
+
+    The bump waits for the commit: admin saves run inside a transaction, and
+    a request that saw the new version before then would cache the old rows
+    under it.
+    """
+    if update_fields and UNTRACKED_FIELDS.issuperset(update_fields):
+        return
+    transaction.on_commit(lambda: bump_content_version(sender))
+
+
+for label in CONTENT_MODELS:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_content, sender=model, dispatch_uid=f'invalidate_content_save_{label}')
+    post_delete.connect(invalidate_content, sender=model, dispatch_uid=f'invalidate_content_delete_{label}')
+
+
+def read_image_dimensions(sender, instance, raw=False, **kwargs):
+    """Read the size of new uploads while they are still in memory."""
+    if raw:
+        return
+    try:
+        read_upload_dimensions(instance)
+    except Exception:
+        logger.exception("Error reading image dimensions for %s", instance._meta.label)
+
+
+def queue_image_jobs(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Queue optimization and responsive variants for newly uploaded images."""
+    if raw:
+        return
+    try:
+        queue_instance_images(instance, update_fields)
+    except Exception:
+        logger.exception("Error queueing image jobs for %s", instance._meta.label)
+
+
+for model in {model for model, field in image_fields()}:
+    pre_save.connect(read_image_dimensions, sender=model, dispatch_uid=f'image_dimensions_{model._meta.label}')
+    post_save.connect(queue_image_jobs, sender=model, dispatch_uid=f'image_jobs_{model._meta.label}')
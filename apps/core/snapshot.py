@@ -0,0 +1,133 @@
+"""
+In-memory snapshot of all public content.
+
+The public dataset is small enough to keep in every worker. A snapshot is
+built once per content version (see apps.core.cache) and then shared by all
+requests until an admin change bumps the version. If the database can't be
+reached while rebuilding, the last good snapshot keeps being served.
+"""
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+from .cache import get_content_version
+from .models import ImageAsset, Skill
+from .utils.schema import is_ready
+from apps.blog.models import BlogPost
+from apps.education.models import Education, Certification
+from apps.experience.models import Experience
+from apps.projects.models import Project
+from apps.testimonials.models import Testimonial
+
+logger = logging.getLogger(__name__)
+
+
+def _index_by(items, key):
+    return MappingProxyType({key(item): item for item in items})
+
+
+def _group_by(items, keys):
+    groups = {}
+    for item in items:
+        for key in keys(item):
+            groups.setdefault(key, []).append(item)
+    return MappingProxyType({key: tuple(group) for key, group in groups.items()})
+
+
+class ContentSnapshot:
+    """
+    Read-only view of the visible rows of every public content model.
+
+    Sequences are tuples in display order and indexes are read-only mappings.
+    The model instances are shared between requests and must not be modified.
+    """
+
+    def __init__(self, version, skills, projects, experiences, education,
+                 certifications, testimonials, blog_posts, image_assets=()):
+        self.version = version
+
+        # Ordered collections (model Meta ordering unless noted)
+        self.skills = tuple(skills)
+        self.projects = tuple(projects)
+        self.experiences = tuple(sorted(experiences, key=lambda e: e.start_date, reverse=True))  # newest first
+        self.education = tuple(education)
+        self.certifications = tuple(certifications)
+        self.testimonials = tuple(testimonials)
+        self.blog_posts = tuple(blog_posts)
+
+        # Derived orderings
+        self.about_projects = tuple(p for p in self.projects if p.show_on_about_page)
+        self.featured_skills = tuple(s for s in self.skills if s.is_featured)
+        self.certifications_by_date = tuple(
+            sorted(self.certifications, key=lambda c: c.date_obtained, reverse=True)
+        )
+        self.blog_posts_by_date = tuple(
+            sorted(self.blog_posts, key=lambda p: p.published_date, reverse=True)
+        )
+
+        # Indexes
+        self.projects_by_slug = _index_by(self.projects, lambda p: p.slug)
+        self.blog_posts_by_slug = _index_by(self.blog_posts, lambda p: p.slug)
+        self.projects_by_category = _group_by(self.projects, lambda p: p.get_categories_list())
+        self.skills_by_category = _group_by(self.skills, lambda s: [s.category])
+        self.image_assets = _index_by(image_assets, lambda a: a.name)  # by storage path
+
+    @classmethod
+    def build(cls, version):
+        """Load every visible row from the database."""
+        def load(model, queryset):
+            return list(queryset) if is_ready(model) else []
+
+        return cls(
+            version=version,
+            skills=load(Skill, Skill.objects.filter(is_active=True).order_by('order', 'name')),
+            projects=load(Project, Project.objects.prefetch_related('images').order_by('order', '-created_at')),
+            experiences=load(Experience, Experience.objects.filter(is_visible=True)),
+            education=load(Education, Education.objects.filter(is_visible=True)),
+            certifications=load(Certification, Certification.objects.filter(
+                is_visible=True
+            ).order_by('order', '-date_obtained')),
+            testimonials=load(Testimonial, Testimonial.objects.filter(
+                is_approved=True
+            ).order_by('order', '-created_at')),
+            blog_posts=load(BlogPost, BlogPost.objects.filter(is_published=True)),
+            image_assets=load(ImageAsset, ImageAsset.objects.all()),
+        )
+
+
+# Don't hammer an unreachable database with rebuild attempts (seconds)
+REBUILD_RETRY_INTERVAL = 10
+
+_snapshot = None
+_failed_at = None
+_lock = threading.Lock()
+
+
+def get_snapshot():
+    """
+    Return the snapshot for the current content version.
+
+    Rebuilds at most once per version per worker. Returns the previous
+    snapshot if the rebuild fails, or None if there has never been one.
+    """
+    global _snapshot, _failed_at
+
+    version = get_content_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    if _failed_at is not None and time.monotonic() - _failed_at < REBUILD_RETRY_INTERVAL:
+        return snapshot
+
+    with _lock:
+        # Another thread may have rebuilt it while we waited
+        if _snapshot is not None and _snapshot.version == version:
+            return _snapshot
+        try:
+            _snapshot = ContentSnapshot.build(version)
+            _failed_at = None
+        except Exception:
+            _failed_at = time.monotonic()
+            logger.exception("Could not rebuild content snapshot; serving the previous one")
+        return _snapshot
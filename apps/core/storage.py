@@ -0,0 +1,64 @@
+"""
+Content-addressed media storage.
+
+Files are saved under the SHA-256 of their content, keeping the upload_to
+folder and the extension: ``projects/thumbnails/foo.jpg`` is stored as
+``projects/thumbnails/<sha256>.jpg``. A name therefore always means the same
+bytes, so media can be served with ``Cache-Control: immutable`` and a
+one-year max-age, and saving content that is already stored writes nothing
+and returns the existing name, so identical uploads share one blob.
+
+Since blobs can be shared, a file another upload may have just been given
+is never deleted in passing: superseded files are left for
+``manage.py collect_orphaned_media``.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from storages.backends.s3boto3 import S3Boto3Storage
+
+# Basename of a content-addressed file: 64 hex digits plus an extension
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.[A-Za-z0-9]+)?$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name):
+    """Whether ``name`` is a content-addressed file (whose bytes never change)."""
+    return bool(HASHED_NAME_RE.search(name))
+
+
+class ContentAddressedMixin:
+    """Name saved files by the hash of their content and skip duplicate writes."""
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, f'{digest.hexdigest()}{ext}').replace('\\', '/')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Same name, same bytes
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedMixin, FileSystemStorage):
+    """Local media storage (development, or production without S3)."""
+
+
+class ContentAddressedS3Storage(ContentAddressedMixin, S3Boto3Storage):
+    """S3 media storage; AWS_S3_OBJECT_PARAMETERS sets the immutable Cache-Control."""
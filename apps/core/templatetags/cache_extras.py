@@ -0,0 +1,64 @@
+"""
+Template tags for caching page sections.
+"""
+
+import hashlib
+
+from django import template
+from django.core.cache import cache
+
+from apps.core.cache import get_content_version, get_model_version, page_cache_timeout
+
+register = template.Library()
+
+
+class SectionCacheNode(template.Node):
+    def __init__(self, nodelist, name, models):
+        self.nodelist = nodelist
+        self.name = name
+        self.models = models
+
+    def render(self, context):
+        # Data from an outdated snapshot must not be stored under current versions
+        data_version = context.get('content_version')
+        if data_version is not None and data_version != get_content_version():
+            return self.nodelist.render(context)
+
+        models = [model.resolve(context) for model in self.models]
+        versions = ':'.join(str(get_model_version(model)) for model in models)
+        digest = hashlib.md5(versions.encode('utf-8')).hexdigest()
+        key = f'section:{self.name}:{digest}'
+
+        content = cache.get(key)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, page_cache_timeout())
+        return content
+
+
+@register.tag('cachesection')
+def do_cachesection(parser, token):
+    """
+    Cache a block of template output until one of the models it shows changes.
+
+    Usage::
+
+        {% cachesection testimonials "testimonials.Testimonial" %}
+            ...
+        {% endcachesection %}
+
+    The first argument names the section; the rest are model labels whose
+    content versions (see apps.core.cache) make up the cache key. The block
+    must not depend on anything else in the request. If the context has a
+    ``content_version`` that is no longer current, the block is rendered
+    without caching.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a section name and at least one model label."
+        )
+    nodelist = parser.parse(('endcachesection',))
+    parser.delete_first_token()
+    models = [parser.compile_filter(bit) for bit in bits[2:]]
+    return SectionCacheNode(nodelist, bits[1], models)
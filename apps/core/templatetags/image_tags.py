@@ -0,0 +1,135 @@
+"""
+Template tags for responsive images.
+"""
+
+from urllib.parse import quote
+
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from apps.core.snapshot import get_snapshot
+from apps.core.utils.thumbnails import thumbnail_url as signed_thumbnail_url
+
+register = template.Library()
+
+
+def _srcset(storage, asset, ext, original):
+    """
+    Srcset of the ``ext`` variants, topped by the optimized original, which
+    is wider than any variant and serves high-DPI screens.
+    """
+    entries = [
+        (storage.url(variant[ext]), variant['width'])
+        for variant in sorted(asset.variants.values(), key=lambda v: v['width'])
+        if ext in variant
+    ]
+    if asset.width and (not entries or asset.width > entries[-1][1]):
+        entries.append((original.url, asset.width))
+    return ', '.join(f'{url} {width}w' for url, width in entries)
+
+
+@register.simple_tag(name='image_asset')
+def get_image_asset(image):
+    """
+    ImageAsset for an image field value, from the content snapshot.
+
+    Usage: {% image_asset post.cover_image as asset %}
+    """
+    snapshot = get_snapshot()
+    if snapshot is None or not image:
+        return None
+    return snapshot.image_assets.get(image.name)
+
+
+@register.filter
+def placeholder_style(asset):
+    """
+    Inline CSS that paints an image's dominant color and blurred preview as
+    the background of its element until the image covers it. Empty for
+    transparent (or not yet processed) images.
+
+    Usage: <c-lazy-image ... placeholder="{{ asset|placeholder_style }}" />
+    """
+    if asset is None or not asset.placeholder:
+        return ''
+    # Blur inside an SVG so the 16px preview doesn't upscale into blocks;
+    # the alpha table keeps the blurred edges from fading out
+    svg = (
+        "<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 {w} {h}'>"
+        "<filter id='b' color-interpolation-filters='sRGB'><feGaussianBlur stdDeviation='20'/>"
+        "<feComponentTransfer><feFuncA type='discrete' tableValues='1 1'/></feComponentTransfer></filter>"
+        "<image filter='url(#b)' preserveAspectRatio='none' width='100%' height='100%' href='{src}'/></svg>"
+    ).format(w=asset.width or 1, h=asset.height or 1, src=asset.placeholder)
+    return (
+        f"background-color: {asset.dominant_color};"
+        f" background-image: url('data:image/svg+xml,{quote(svg)}');"
+        " background-size: cover; background-position: center;"
+    )
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', loading='lazy', fetchpriority='', **attrs):
+    """
+    Render an image field as <picture> with WebP and JPEG (or PNG) srcsets.
+
+    Usage: {% responsive_image project.thumbnail alt=project.title sizes="(min-width: 768px) 33vw, 100vw" class="..." %}
+
+    ``sizes`` should describe the rendered width so the browser can pick the
+    smallest variant; the optimized original tops both srcsets at its own
+    width for wide and high-DPI screens. Above-the-fold images should pass loading="eager" and
+    fetchpriority="high". Images without variants (not generated yet, or
+    too small to need them) fall back to a plain <img> of the original.
+    Width and height are known from upload, so the space is reserved either
+    way, and a placeholder is painted once the image has been processed.
+    """
+    if not image:
+        return ''
+
+    asset = get_image_asset(image)
+    img_attrs = {'alt': alt, **attrs}
+    if loading:
+        img_attrs['loading'] = loading
+    img_attrs['decoding'] = 'async'
+    if fetchpriority:
+        img_attrs['fetchpriority'] = fetchpriority
+    if asset is not None and asset.width and asset.height:
+        img_attrs['width'], img_attrs['height'] = asset.width, asset.height
+    placeholder = placeholder_style(asset)
+    if placeholder:
+        img_attrs['style'] = f"{placeholder} {attrs['style']}" if attrs.get('style') else placeholder
+
+    if asset is None or not asset.variants:
+        return format_html('<img src="{}" {}>', image.url, _attributes(img_attrs))
+
+    storage = image.storage
+    largest = max(asset.variants.values(), key=lambda v: v['width'])
+    return format_html(
+        '<picture style="display: contents"><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        _srcset(storage, asset, 'webp', image),
+        sizes,
+        storage.url(largest['fallback']),
+        _srcset(storage, asset, 'fallback', image),
+        sizes,
+        _attributes(img_attrs),
+    )
+
+
+@register.simple_tag
+def thumbnail_url(image, width, height, fit='contain'):
+    """
+    Signed URL of an image resized on demand to fit (or, with fit="cover",
+    fill and crop to) a width x height box.
+
+    Usage: <img src="{% thumbnail_url project.thumbnail 400 300 'cover' %}" width="400" height="300" alt="">
+
+    For sizes the responsive variants don't cover; the first request
+    renders the thumbnail, later ones are served from the disk cache.
+    """
+    if not image:
+        return ''
+    return signed_thumbnail_url(image.name, int(width), int(height), fit)
+
+
+def _attributes(attrs):
+    return format_html_join(' ', '{}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
@@ -1,3 +1,133 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.messages import info
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from .middleware import PageCacheMiddleware
+from .models import SiteSettings, Skill
+
+
+class PageCacheTests(TransactionTestCase):
+    """Anonymous pages are cached until content changes and the change commits."""
+
+    def setUp(self):
+        cache.clear()
+        SiteSettings._cached = None
+        SiteSettings.objects.create(email='owner@example.com')
+
+    def test_cached_page_is_served_until_a_save_commits(self):
+        self.assertEqual(self.client.get('/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/')['X-Page-Cache'], 'HIT')
+
+        with transaction.atomic():
+            Skill.objects.create(name='Rust', category='compute', subcategory='Languages', is_featured=True)
+            # Not committed yet: the old page is still current
+            self.assertEqual(self.client.get('/')['X-Page-Cache'], 'HIT')
+
+        response = self.client.get('/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Rust')
+
+
+class PageCacheResponseTests(TestCase):
+    """Responses that carry per-visitor state are never stored."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def cache_response(self, view):
+        request = self.factory.get('/')
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        request._page_cache_key = 'page:test'
+
+        def get_response(request):
+            view(request)
+            return HttpResponse('page')
+
+        PageCacheMiddleware(get_response)(request)
+        return cache.get('page:test')
+
+    def test_plain_response_is_cached(self):
+        self.assertIsNotNone(self.cache_response(lambda request: None))
+
+    def test_session_access_is_not_cached(self):
+        self.assertIsNone(self.cache_response(lambda request: request.session.get('seen')))
+
+    def test_csrf_token_is_not_cached(self):
+        self.assertIsNone(self.cache_response(get_token))
+
+    def test_messages_are_not_cached(self):
+        self.assertIsNone(self.cache_response(lambda request: info(request, 'Saved')))
+
+
+class ConditionalGetTests(TestCase):
+    """Public pages answer revalidation with 304 from either validator."""
+
+    def setUp(self):
+        cache.clear()
+        SiteSettings._cached = None
+        SiteSettings.objects.create(email='owner@example.com')
+        Skill.objects.create(name='Go', category='compute', subcategory='Languages', is_featured=True)
+        response = self.client.get('/')
+        self.etag, self.last_modified = response['ETag'], response['Last-Modified']
+        # Make the view, not the page cache, answer
+        cache.clear()
+
+    def test_etag(self):
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=self.etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.etag)
+
+    def test_last_modified(self):
+        response = self.client.get('/', HTTP_IF_MODIFIED_SINCE=self.last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_etag_gets_the_page(self):
+        response = self.client.get('/', HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+
+class CollectOrphanedMediaTests(TestCase):
+    """collect_orphaned_media only deletes unreferenced files in upload directories."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_old_file(self, name):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'data')
+        old = time.time() - 7 * 24 * 3600
+        os.utime(path, (old, old))
+        return path
+
+    def test_files_outside_upload_directories_are_kept(self):
+        orphan = self.write_old_file('projects/thumbnails/orphan.jpg')
+        derived = self.write_old_file('derived/projects/thumbnails/orphan/variant.webp')
+        unrelated = self.write_old_file('backups/site.sql')
+        at_root = self.write_old_file('robots.txt')
+
+        call_command('collect_orphaned_media', grace_hours=1, stdout=StringIO(), stderr=StringIO())
+
+        self.assertFalse(os.path.exists(orphan))
+        self.assertFalse(os.path.exists(derived))
+        self.assertTrue(os.path.exists(unrelated))
+        self.assertTrue(os.path.exists(at_root))
@@ -0,0 +1,71 @@
+"""
+Time-windowed de-duplication of repeated events.
+
+A reload storm or a bot hammering the same URL shouldn't turn into one row
+(or one counter increment) per hit. ``RecentEvents`` remembers which keys it
+has seen recently and reports repeats, so callers can drop them before they
+reach the database.
+
+Keys are hashed to 64-bit integers and kept in two time buckets: the
+current one and the previous one. A key counts as a repeat if either
+bucket has it, and buckets rotate every ``window`` seconds, so a repeat is
+suppressed for at least ``window`` and at most twice that. Each bucket holds
+at most ``max_keys`` entries; when one fills up it rotates early, which
+shortens the window under load instead of growing memory. The state is per
+process, so with several workers a repeat can still get through once per
+worker.
+"""
+import hashlib
+import threading
+import time
+
+
+class RecentEvents:
+    """Bounded, time-bucketed set of recently seen event keys."""
+
+    def __init__(self, window, max_keys=20000):
+        self.window = window
+        self.max_keys = max_keys
+        self._current = set()
+        self._previous = set()
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    @staticmethod
+    def key(*parts):
+        digest = hashlib.blake2b('\x1f'.join(str(part) for part in parts).encode('utf-8'), digest_size=8)
+        return int.from_bytes(digest.digest(), 'big')
+
+    def seen(self, *parts):
+        """
+        Record an event and return True if the same key was seen within the window.
+
+        ``parts`` identify the event, e.g. (ip, user agent, target). A window
+        of 0 disables de-duplication.
+        """
+        if not self.window:
+            return False
+
+        key = self.key(*parts)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._rotated_at >= 2 * self.window:
+                # Idle for a while: everything has expired
+                self._previous, self._current = set(), set()
+                self._rotated_at = now
+            elif now - self._rotated_at >= self.window or len(self._current) >= self.max_keys:
+                self._previous, self._current = self._current, set()
+                self._rotated_at = now
+
+            if key in self._current or key in self._previous:
+                self.suppressed += 1
+                return True
+            self._current.add(key)
+            return False
+
+    def clear(self):
+        with self._lock:
+            self._current.clear()
+            self._previous.clear()
+            self.suppressed = 0
@@ -0,0 +1,82 @@
+"""
+Base class for in-process write buffers.
+
+Request handlers record cheap in-memory events; a daemon timer writes them
+to the database in one go every ``interval`` seconds, and whatever is left
+is written when the worker exits.
+"""
+import atexit
+import logging
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    """
+    Buffer that flushes itself on a timer.
+
+    Subclasses keep their pending data under ``self._lock`` and implement
+    ``take()`` (remove and return everything pending, or None when empty)
+    and ``write(pending)`` (persist it). An interval of 0 writes
+    synchronously on every ``schedule()`` call, which is handy in tests.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def take(self):
+        raise NotImplementedError
+
+    def write(self, pending):
+        raise NotImplementedError
+
+    def schedule(self, immediate=False):
+        """
+        Make sure a flush will happen; call after recording an event.
+
+        ``immediate`` starts the background flush now instead of waiting for
+        the interval, e.g. once a batch is full.
+        """
+        if not self.interval:
+            self.flush()
+            return
+        with self._lock:
+            if self._timer is not None:
+                if not immediate:
+                    return
+                self._timer.cancel()
+            self._timer = threading.Timer(0 if immediate else self.interval, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write everything pending now. Returns what was written, or None."""
+        with self._lock:
+            pending = self.take()
+        if not pending:
+            return None
+        try:
+            self.write(pending)
+        except Exception:
+            logger.exception("%s failed to write buffered data", type(self).__name__)
+            self.restore(pending)
+        return pending
+
+    def restore(self, pending):
+        """Put back data whose write failed; it goes out with the next flush."""
+        raise NotImplementedError
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own connection; don't leak it
+            connections.close_all()
@@ -0,0 +1,143 @@
+"""
+Responsive variants for every uploaded image.
+
+Each file referenced from an ImageField gets small/medium/large variants
+(ImageOptimizer.THUMBNAIL_SIZES) in WebP and JPEG (PNG if transparent),
+stored under ``derived/<original path without extension>/`` and recorded in
+an ImageAsset row by the background image worker (see image_worker.py).
+Content-addressed storage names each variant ``<sha256>.<ext>``, so the
+stored path is only known from the ImageAsset row. The
+``responsive_image`` template tag reads those rows from the content snapshot
+to build srcset attributes without touching storage.
+
+Sizes the original doesn't exceed are skipped, so small logos get fewer (or
+no) variants and are served as uploaded. Every image also gets a dominant
+color and a tiny blurred preview that templates paint while it loads.
+"""
+import base64
+import os
+from collections import namedtuple
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import models
+
+from .image_optimizer import ImageOptimizer
+
+DERIVED_PREFIX = 'derived'
+
+# WebP for browsers that support it, plus a fallback for the <img> src:
+# JPEG, or PNG when the original has transparency (or when a palette PNG of
+# a flat graphic beats JPEG). Each is encoded with ImageOptimizer.encode_best
+# and the winning format and quality is kept under 'encodings'.
+VARIANT_FORMATS = ('webp', 'fallback')
+
+# Longest side of the blurred preview stored on ImageAsset.placeholder
+PLACEHOLDER_SIZE = 16
+
+# Everything generate_derivatives records on the ImageAsset row
+Derivatives = namedtuple('Derivatives', ['width', 'height', 'variants', 'dominant_color', 'placeholder'])
+
+
+def image_fields():
+    """Yield (model, field) for every ImageField in the project's apps."""
+    for app_config in apps.get_app_configs():
+        if not app_config.name.startswith('apps.'):
+            continue
+        for model in app_config.get_models():
+            for field in model._meta.get_fields():
+                if isinstance(field, models.ImageField):
+                    yield model, field
+
+
+def referenced_images():
+    """Yield (name, field label) for every distinct file referenced from an ImageField."""
+    seen = set()
+    for model, field in image_fields():
+        names = (
+            model._default_manager.exclude(**{field.name: ''})
+            .exclude(**{f'{field.name}__isnull': True})
+            .values_list(field.name, flat=True)
+            .distinct()
+        )
+        for name in names.iterator():
+            if name not in seen:
+                seen.add(name)
+                yield name, field_label(model, field)
+
+
+def variant_path(name, size, ext):
+    """Name to save one variant of the file at ``name`` under (storage may hash the basename)."""
+    stem = os.path.splitext(name)[0]
+    return f'{DERIVED_PREFIX}/{stem}/{size}.{ext}'
+
+
+def field_label(model, field):
+    return f'{model._meta.label}.{field.name}'
+
+
+def get_image_field(label):
+    """Return (model, field) for an 'app_label.Model.field' label, or None."""
+    for model, field in image_fields():
+        if field_label(model, field) == label:
+            return model, field
+    return None
+
+
+def image_placeholder(img):
+    """
+    Return (dominant color, preview data URI) for a decoded image.
+
+    The color only counts opaque pixels. Images with transparency get no
+    preview: anything painted behind them would show through.
+    """
+    small = ImageOptimizer.resize_to_fit(img, (64, 64))
+    mask = small.getchannel('A').point(lambda a: 255 if a >= 128 else 0) if 'A' in small.getbands() else None
+    palette = small.convert('RGB').quantize(5)
+    counts = palette.histogram(mask)
+    if not any(counts):
+        return '', ''
+    index = counts.index(max(counts))
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    color = f'#{red:02x}{green:02x}{blue:02x}'
+    if mask is not None:
+        return color, ''
+
+    preview = ImageOptimizer.resize_to_fit(small, (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    data = ImageOptimizer.encode(preview, 'WEBP', quality=40)
+    return color, 'data:image/webp;base64,' + base64.b64encode(data).decode('ascii')
+
+
+def generate_derivatives(storage, name):
+    """
+    Create every variant of the image stored at ``name``.
+
+    The original is decoded once, at the resolution the largest variant
+    needs, and every size (and the placeholder) is made from that frame.
+    Variants from an earlier run are left for collect_orphaned_media.
+    Returns Derivatives for the ImageAsset row.
+    """
+    sizes = ImageOptimizer.THUMBNAIL_SIZES
+    with storage.open(name, 'rb') as file:
+        # Upright size, so the EXIF orientation is taken into account
+        source = ImageOptimizer.open_source(file, max(sizes.values()), keep_alpha=True)
+    width, height = source.size
+    formats = {
+        'webp': ('WEBP',),
+        'fallback': ('PNG',) if source.has_alpha else ('JPEG',) if source.format == 'JPEG' else ('JPEG', 'PNG'),
+    }
+
+    variants = {}
+    for size, box in sizes.items():
+        if width <= box[0] and height <= box[1]:
+            continue
+        resized = ImageOptimizer.resize_to_fit(source.image, box)
+        variant = {'width': resized.width, 'height': resized.height, 'encodings': {}}
+        for key in VARIANT_FORMATS:
+            encoding = ImageOptimizer.encode_best(resized, formats[key])
+            path = variant_path(name, size, encoding.extension.lstrip('.'))
+            variant[key] = storage.save(path, ContentFile(encoding.data))
+            variant['encodings'][key] = encoding.describe()
+        variants[size] = variant
+
+    return Derivatives(width, height, variants, *image_placeholder(source.image))
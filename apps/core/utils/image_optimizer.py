@@ -2,135 +2,344 @@
 Image optimization utilities.
 """
 import os
+import time
+from collections import namedtuple
 from io import BytesIO
-from PIL import Image
+from PIL import Image, ImageOps
+from django.conf import settings
 from django.core.files.base import ContentFile
 
+from .similarity import similarity
+
+
+# A decoded image plus facts about the file it came from
+SourceImage = namedtuple('SourceImage', ['image', 'size', 'has_alpha', 'format'])
+
+EXTENSIONS = {'JPEG': '.jpg', 'WEBP': '.webp', 'PNG': '.png'}
+
+
+class ImageTooLarge(ValueError):
+    """The image would need more memory to decode than MAX_DECODE_PIXELS allows."""
+
+
+class Encoding(namedtuple('Encoding', ['data', 'format', 'kind', 'quality', 'similarity'])):
+    """
+    Encoded image bytes and how they were made. ``kind`` is 'lossy',
+    'lossless' or 'palette'; ``similarity`` is None when it wasn't measured.
+    """
+    __slots__ = ()
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self.format]
+
+    def describe(self):
+        """JSON-friendly summary, as recorded on ImageAsset variants."""
+        return {
+            'format': self.format,
+            'kind': self.kind,
+            'quality': self.quality,
+            'similarity': None if self.similarity is None else round(self.similarity, 4),
+            'bytes': len(self.data),
+        }
+
+# EXIF orientation tag, and the orientations that swap width and height
+ORIENTATION = 0x0112
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
 
 class ImageOptimizer:
     """Optimize images by resizing and compressing."""
-    
+
     # Maximum dimensions
     MAX_WIDTH = 1920
     MAX_HEIGHT = 1080
-    
+
     # Thumbnail sizes
     THUMBNAIL_SIZES = {
         'small': (480, 480),
         'medium': (768, 768),
         'large': (1200, 1200),
     }
-    
+
     # Quality settings
     JPEG_QUALITY = 85
     WEBP_QUALITY = 85
-    
+
+    # Downscale in two steps: a cheap integer reduction (DCT scaling for
+    # JPEG) down to this many times the target size, then LANCZOS. At 3.0
+    # the result is indistinguishable from a single LANCZOS pass.
+    REDUCING_GAP = 3.0
+
+    # Adaptive encoding: try candidate formats and qualities and keep the
+    # smallest whose SSIM against the source is at least SIMILARITY_THRESHOLD,
+    # spending at most ENCODE_BUDGET seconds of CPU per output. When off,
+    # the first format is encoded at the fixed qualities above.
+    ADAPTIVE_ENCODING = getattr(settings, 'IMAGE_ADAPTIVE_ENCODING', True)
+    ENCODE_BUDGET = getattr(settings, 'IMAGE_ENCODE_BUDGET', 1.5)
+    SIMILARITY_THRESHOLD = getattr(settings, 'IMAGE_SIMILARITY_THRESHOLD', 0.98)
+    QUALITY_RANGE = (40, 95)
+
+    # Largest frame open_source() will decode, after JPEG draft scaling
+    # (about 4 bytes of memory per pixel, times the copies made on the way)
+    MAX_DECODE_PIXELS = getattr(settings, 'IMAGE_MAX_DECODE_PIXELS', 40_000_000)
+    # WebP effort while searching: 6x faster than 6 for ~1% larger files
+    WEBP_SEARCH_METHOD = 4
+
+    @staticmethod
+    def has_alpha(img):
+        """Whether an opened image has any transparency."""
+        return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+    @staticmethod
+    def fit_size(size, box):
+        """Size of ``size`` scaled down (never up) to fit inside ``box``, keeping the aspect ratio."""
+        width, height = size
+        scale = min(box[0] / width, box[1] / height, 1)
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    @classmethod
+    def prepare_mode(cls, img, keep_alpha=False):
+        """
+        Convert an opened image to RGB, or RGBA if it has transparency and
+        ``keep_alpha`` is set; otherwise transparency is flattened onto white.
+        """
+        if cls.has_alpha(img):
+            img = img.convert('RGBA')
+            if keep_alpha:
+                return img
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            return background
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        return img
+
+    @staticmethod
+    def upright_size(img):
+        """Size of an opened image once its EXIF orientation is applied (reads only the header)."""
+        width, height = img.size
+        if img.getexif().get(ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+            return height, width
+        return width, height
+
+    @classmethod
+    def open_source(cls, file, max_size=None, keep_alpha=False):
+        """
+        Decode an image once, at the lowest resolution that can still produce
+        ``max_size`` (the largest box any output needs) at full quality.
+
+        JPEGs are decoded straight at 1/2, 1/4 or 1/8 scale (draft mode), so a
+        24-megapixel photo bound for 1200px never exists in memory at full
+        size. Anything that would still decode to more than MAX_DECODE_PIXELS
+        raises ImageTooLarge before a pixel is read; only the first frame of
+        an animation is decoded. EXIF orientation is applied. Returns a
+        SourceImage whose ``size`` is the original (upright) size.
+        """
+        img = Image.open(file)
+        width, height = cls.upright_size(img)
+        alpha = cls.has_alpha(img)
+
+        if max_size and img.format == 'JPEG':
+            target = cls.fit_size((width, height), max_size)
+            if (width, height) != img.size:
+                target = target[::-1]
+            img.draft(
+                'RGB' if img.mode in ('RGB', 'YCbCr', 'CMYK') else None,
+                (int(target[0] * cls.REDUCING_GAP), int(target[1] * cls.REDUCING_GAP)),
+            )
+
+        if img.width * img.height > cls.MAX_DECODE_PIXELS:
+            raise ImageTooLarge(
+                f"{width}x{height} {img.format} image is too large to decode "
+                f"({cls.MAX_DECODE_PIXELS // 1_000_000} megapixel limit)"
+            )
+
+        img_format = img.format
+        img = ImageOps.exif_transpose(img)
+        img = cls.prepare_mode(img, keep_alpha=keep_alpha)
+        if img.mode == 'RGBA' and img.getchannel('A').getextrema()[0] == 255:
+            # An alpha channel with nothing transparent in it
+            img, alpha = img.convert('RGB'), False
+        return SourceImage(img, (width, height), alpha, img_format)
+
+    @classmethod
+    def resize_to_fit(cls, img, box):
+        """Return a copy of a decoded image scaled down to fit ``box`` (or the image itself)."""
+        size = cls.fit_size((img.width, img.height), box)
+        if size == img.size:
+            return img
+        return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=cls.REDUCING_GAP)
+
+    @classmethod
+    def encode(cls, img, img_format, quality=None, lossless=False, method=6):
+        """Encode a decoded image; returns bytes. ``method`` is the WebP effort (0-6)."""
+        output = BytesIO()
+        if img_format == 'JPEG':
+            if img.mode not in ('RGB', 'L'):
+                img = cls.prepare_mode(img)
+            img.save(output, format='JPEG', quality=quality or cls.JPEG_QUALITY, optimize=True, progressive=True)
+        elif img_format == 'WEBP' and lossless:
+            img.save(output, format='WEBP', lossless=True, quality=80, method=4)
+        elif img_format == 'WEBP':
+            img.save(output, format='WEBP', quality=quality or cls.WEBP_QUALITY, method=method)
+        elif lossless:
+            # zlib's default level; optimize=True costs far more than it saves
+            img.save(output, format=img_format)
+        else:
+            img.save(output, format=img_format, optimize=True)
+        return output.getvalue()
+
+    @classmethod
+    def encode_best(cls, img, formats, budget=None, threshold=None):
+        """
+        Encode ``img`` as the smallest candidate that still looks like it.
+
+        ``formats`` lists acceptable formats in order of preference; JPEG is
+        skipped for images with transparency. Candidates are a quality search
+        for JPEG and WebP, lossless WebP, and palette and lossless PNG. Each
+        is decoded again and compared with the source (see similarity.py);
+        lossless ones always pass. The search stops once ``budget`` seconds
+        of CPU are spent, and if nothing passed by then the first format is
+        encoded at its fixed quality. Returns an Encoding.
+        """
+        img_formats = [f for f in formats if not (f == 'JPEG' and 'A' in img.getbands())]
+        if not cls.ADAPTIVE_ENCODING:
+            return cls._fixed_encoding(img, img_formats[0])
+
+        budget = cls.ENCODE_BUDGET if budget is None else budget
+        threshold = cls.SIMILARITY_THRESHOLD if threshold is None else threshold
+        # Per-thread CPU time, so other worker threads don't eat the budget
+        deadline = time.thread_time() + budget
+        best = None
+
+        def consider(encoding):
+            nonlocal best
+            if best is None or len(encoding.data) < len(best.data):
+                best = encoding
+
+        for img_format in img_formats:
+            if img_format in ('JPEG', 'WEBP'):
+                found = cls._search_quality(img, img_format, threshold, deadline)
+                if found:
+                    consider(found)
+            if img_format == 'PNG' and time.thread_time() < deadline:
+                palette = img.quantize(256, method=Image.Quantize.FASTOCTREE)
+                data = cls.encode(palette, 'PNG', lossless=True)
+                score = similarity(img, Image.open(BytesIO(data)))
+                if score >= threshold:
+                    consider(Encoding(data, 'PNG', 'palette', None, score))
+            if img_format in ('WEBP', 'PNG') and time.thread_time() < deadline:
+                consider(Encoding(cls.encode(img, img_format, lossless=True), img_format, 'lossless', None, 1.0))
+
+        return best or cls._fixed_encoding(img, img_formats[0])
+
+    @classmethod
+    def _fixed_encoding(cls, img, img_format):
+        kind = 'lossless' if img_format == 'PNG' else 'lossy'
+        return Encoding(cls.encode(img, img_format), img_format, kind, None, None)
+
+    @classmethod
+    def _search_quality(cls, img, img_format, threshold, deadline):
+        """Binary search for the lowest quality that meets ``threshold``."""
+        low, high = cls.QUALITY_RANGE
+        found = None
+        while low <= high and time.thread_time() < deadline:
+            quality = (low + high) // 2
+            data = cls.encode(img, img_format, quality=quality, method=cls.WEBP_SEARCH_METHOD)
+            score = similarity(img, Image.open(BytesIO(data)))
+            if score >= threshold:
+                found = Encoding(data, img_format, 'lossy', quality, score)
+                high = quality - 1
+            else:
+                low = quality + 1
+        return found
+
     @classmethod
     def optimize_image(cls, image_field, max_width=None, max_height=None):
         """
         Optimize an image by resizing and compressing.
-        
+
         Args:
             image_field: Django ImageField
             max_width: Maximum width (default: MAX_WIDTH)
             max_height: Maximum height (default: MAX_HEIGHT)
-            
+
         Returns:
-            Optimized image as ContentFile
+            Optimized image as ContentFile. With adaptive encoding an opaque
+            PNG may come back as a JPEG, in which case the name changes too.
+
+        Raises:
+            ImageTooLarge: if the image is over MAX_DECODE_PIXELS
         """
         if not image_field:
             return None
-        
+
         max_width = max_width or cls.MAX_WIDTH
         max_height = max_height or cls.MAX_HEIGHT
-        
+
         try:
-            # Open image
-            img = Image.open(image_field)
-            
-            # Convert RGBA to RGB if necessary
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Resize if needed
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-            
-            # Save optimized image
-            output = BytesIO()
-            img_format = 'JPEG'
-            
             # Determine format from filename
             filename = image_field.name
+            img_format = 'JPEG'
             if filename.lower().endswith('.png'):
                 img_format = 'PNG'
             elif filename.lower().endswith('.webp'):
                 img_format = 'WEBP'
-            
-            # Save with optimization
-            if img_format == 'JPEG':
-                img.save(output, format=img_format, quality=cls.JPEG_QUALITY, optimize=True)
-            elif img_format == 'WEBP':
-                img.save(output, format=img_format, quality=cls.WEBP_QUALITY)
-            else:
-                img.save(output, format=img_format, optimize=True)
-            
-            output.seek(0)
-            
-            # Get filename
-            name = os.path.basename(filename)
-            
-            return ContentFile(output.read(), name=name)
-            
+
+            source = cls.open_source(image_field, (max_width, max_height), keep_alpha=img_format != 'JPEG')
+            img = cls.resize_to_fit(source.image, (max_width, max_height))
+
+            # PNG is often a photo or screenshot that JPEG stores far smaller
+            formats = ('PNG', 'JPEG') if img_format == 'PNG' else (img_format,)
+            encoding = cls.encode_best(img, formats)
+            name = os.path.splitext(os.path.basename(filename))[0] + encoding.extension
+
+            return ContentFile(encoding.data, name=name)
+
+        except ImageTooLarge:
+            raise
         except Exception as e:
             print(f"Error optimizing image: {e}")
             return None
-    
+
     @classmethod
-    def create_thumbnail(cls, image_field, size='medium'):
+    def create_thumbnail(cls, image_field, size='medium', img_format='JPEG'):
         """
         Create a thumbnail of specified size.
-        
+
+        To make several sizes of one image, decode it once with open_source()
+        and use resize_to_fit() and encode() instead.
+
         Args:
             image_field: Django ImageField
             size: 'small', 'medium', or 'large'
-            
+            img_format: 'JPEG', 'WEBP' or 'PNG'
+
         Returns:
             Thumbnail as ContentFile
+
+        Raises:
+            ImageTooLarge: if the image is over MAX_DECODE_PIXELS
         """
         if not image_field or size not in cls.THUMBNAIL_SIZES:
             return None
-        
+
         try:
-            img = Image.open(image_field)
-            
-            # Convert RGBA to RGB
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            
-            # Create thumbnail
-            img.thumbnail(cls.THUMBNAIL_SIZES[size], Image.Resampling.LANCZOS)
-            
-            # Save
-            output = BytesIO()
-            img.save(output, format='JPEG', quality=cls.JPEG_QUALITY, optimize=True)
-            output.seek(0)
-            
+            box = cls.THUMBNAIL_SIZES[size]
+            source = cls.open_source(image_field, box, keep_alpha=img_format != 'JPEG')
+            img = cls.resize_to_fit(source.image, box)
+            ext = {'WEBP': '.webp', 'PNG': '.png'}.get(img_format, '.jpg')
+
             # Generate filename
             filename = os.path.basename(image_field.name)
-            name, ext = os.path.splitext(filename)
+            name = os.path.splitext(filename)[0]
             thumb_name = f"{name}_{size}{ext}"
-            
-            return ContentFile(output.read(), name=thumb_name)
-            
+
+            return ContentFile(cls.encode(img, img_format), name=thumb_name)
+
+        except ImageTooLarge:
+            raise
         except Exception as e:
             print(f"Error creating thumbnail: {e}")
             return None
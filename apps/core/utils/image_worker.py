@@ -0,0 +1,268 @@
+"""
+Background optimization of uploaded images.
+
+Saving a model stores the uploaded file as-is and queues a job, so the admin
+request no longer waits for resizing, re-encoding or re-uploading to S3. A
+job is an ImageAsset row in the 'pending' state; a worker thread claims it,
+runs ImageOptimizer on the original, swaps the optimized file in and
+generates the responsive variants (see image_derivatives.py).
+
+Jobs are idempotent: a job is claimed with a conditional UPDATE, so it runs
+once even if it is queued twice or by several processes, and an original
+that doesn't get smaller is left alone. The swap is a single transaction
+that only updates rows still pointing at the original, so an image replaced
+in the meantime is never overwritten. Files are never deleted by a job:
+with content-addressed storage an identical upload may share them, so
+superseded ones are left for ``manage.py collect_orphaned_media``. Failed jobs are retried with
+exponential backoff up to IMAGE_JOB_MAX_ATTEMPTS times and then marked
+'failed'; ``manage.py process_images`` re-runs pending, stuck and (with
+--retry-failed) failed jobs, e.g. after a restart.
+"""
+import hashlib
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F, ImageField
+from django.utils import timezone
+from PIL import Image
+
+from ..cache import bump_content_version
+from ..models import ImageAsset
+from .image_derivatives import field_label, generate_derivatives, get_image_field, image_fields
+from .image_optimizer import ImageOptimizer
+
+logger = logging.getLogger(__name__)
+
+# Per-field size limits for the optimized original; others use ImageOptimizer.MAX_*
+FIELD_LIMITS = {
+    'core.SiteSettings.profile_image': (500, 500),  # Profile images don't need to be huge
+}
+
+# Keep the original unless optimizing saves at least this fraction of its size
+MIN_SAVING = 0.05
+
+
+def field_storage(label):
+    """Storage of the image field with this label (default storage if unknown)."""
+    found = get_image_field(label) if label else None
+    return found[1].storage if found else default_storage
+
+
+def file_hash(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as f:
+        for chunk in f.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def optimize_file(storage, name, label=''):
+    """
+    Save an optimized copy of the image at ``name`` if that makes it smaller.
+
+    Only touches storage. Returns (new_name, old_size, new_size); new_name is
+    None when the original is kept.
+    """
+    max_width, max_height = FIELD_LIMITS.get(label, (None, None))
+    with storage.open(name, 'rb') as original:
+        optimized = ImageOptimizer.optimize_image(original, max_width=max_width, max_height=max_height)
+    if optimized is None:
+        raise ValueError(f"Could not optimize {name}")
+    old_size = storage.size(name)
+    if optimized.size > old_size * (1 - MIN_SAVING):
+        return None, old_size, old_size
+    new_name = storage.save(os.path.join(os.path.dirname(name), optimized.name), optimized)
+    return new_name, old_size, optimized.size
+
+
+def swap_references(old_name, new_name):
+    """
+    Point every image field that still references ``old_name`` at ``new_name``.
+
+    Runs in one transaction and also renames the ImageAsset row, or drops
+    it if ``new_name`` already has one (content-addressed storage returns
+    the existing file when the optimized bytes are already stored). Returns
+    the models whose rows were updated (empty if the image was replaced in
+    the meantime).
+    """
+    touched = []
+    with transaction.atomic():
+        for model, field in image_fields():
+            updated = model._default_manager.filter(**{field.name: old_name}).update(**{field.name: new_name})
+            if updated:
+                touched.append(model)
+        if touched:
+            if ImageAsset.objects.filter(name=new_name).exists():
+                ImageAsset.objects.filter(name=old_name).delete()
+            else:
+                ImageAsset.objects.filter(name=old_name).update(name=new_name, updated_at=timezone.now())
+    if touched:
+        # Queryset updates send no post_save
+        bump_content_version(*touched)
+    return touched
+
+
+def process_image(name):
+    """
+    Run the job for the image stored at ``name``.
+
+    Returns True if it finished, False if it failed or was not ours to run.
+    """
+    claimed = ImageAsset.objects.filter(name=name, status=ImageAsset.STATUS_PENDING).update(
+        status=ImageAsset.STATUS_PROCESSING, attempts=F('attempts') + 1, updated_at=timezone.now(),
+    )
+    if not claimed:
+        return False
+
+    asset = ImageAsset.objects.get(name=name)
+    storage = field_storage(asset.field)
+    try:
+        new_name = optimize_file(storage, asset.name, asset.field)[0]
+        # Stored files may be shared by identical uploads, so the original
+        # (or our copy, if the image was replaced while we worked) is left
+        # for collect_orphaned_media rather than deleted here
+        if new_name and swap_references(asset.name, new_name):
+            asset.name = new_name
+            if not ImageAsset.objects.filter(pk=asset.pk).exists():
+                # Merged into the ImageAsset of an identical file
+                return True
+        derivatives = generate_derivatives(storage, asset.name)
+        asset.width, asset.height, asset.variants = derivatives.width, derivatives.height, derivatives.variants
+        asset.dominant_color, asset.placeholder = derivatives.dominant_color, derivatives.placeholder
+        asset.content_hash = file_hash(storage, asset.name)
+        asset.status = ImageAsset.STATUS_READY
+        asset.last_error = ''
+        asset.save()
+        return True
+    except Exception as e:
+        logger.exception("Image job for %s failed (attempt %d)", asset.name, asset.attempts)
+        asset.status = (
+            ImageAsset.STATUS_FAILED if asset.attempts >= image_worker.max_attempts
+            else ImageAsset.STATUS_PENDING
+        )
+        asset.last_error = str(e)
+        asset.save(update_fields=['status', 'last_error', 'updated_at'])
+        if asset.status == ImageAsset.STATUS_PENDING:
+            image_worker.retry_later(asset.name, asset.attempts)
+        return False
+
+
+class ImageWorker:
+    """
+    Thread pool that runs image jobs for this process.
+
+    With 0 threads jobs run inline when the saving transaction commits,
+    which is handy in tests and one-off scripts.
+    """
+
+    def __init__(self, threads=1, max_attempts=3, retry_delay=30):
+        self.threads = threads
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def submit(self, name):
+        """Run the job for ``name`` once the current transaction commits."""
+        transaction.on_commit(lambda: self._enqueue(name))
+
+    def retry_later(self, name, attempts):
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        timer = threading.Timer(delay, self._enqueue, [name])
+        timer.daemon = True
+        timer.start()
+
+    def _enqueue(self, name):
+        if not self.threads:
+            process_image(name)
+            return
+        self._start()
+        self._queue.put(name)
+
+    def _start(self):
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.threads):
+                threading.Thread(target=self._run, name=f'image-worker-{i}', daemon=True).start()
+            self._started = True
+
+    def _run(self):
+        while True:
+            name = self._queue.get()
+            try:
+                process_image(name)
+            except Exception:
+                logger.exception("Image worker crashed on %s", name)
+            finally:
+                # Worker threads get their own connection; don't leak it
+                connections.close_all()
+
+
+image_worker = ImageWorker(
+    threads=getattr(settings, 'IMAGE_WORKER_THREADS', 1),
+    max_attempts=getattr(settings, 'IMAGE_JOB_MAX_ATTEMPTS', 3),
+    retry_delay=getattr(settings, 'IMAGE_JOB_RETRY_DELAY', 30),
+)
+
+
+def read_upload_dimensions(instance):
+    """
+    Note the upright size of every image on ``instance`` that is about to
+    be uploaded (pre_save), read from the header of the file in memory.
+    queue_instance_images() records it, so pages can reserve space for the
+    image before its job has run without fetching it back from storage.
+    """
+    dimensions = {}
+    for field in instance._meta.get_fields():
+        if not isinstance(field, ImageField):
+            continue
+        field_file = getattr(instance, field.attname)
+        if field_file and not field_file._committed:
+            dimensions[field.attname] = read_dimensions(field_file.file, field_file.name)
+    instance._upload_dimensions = dimensions
+
+
+def queue_instance_images(instance, update_fields=None):
+    """Queue a job for every image on ``instance`` that doesn't have one yet."""
+    model = type(instance)
+    uploaded = getattr(instance, '_upload_dimensions', {})
+    files = {}
+    for field in instance._meta.get_fields():
+        if not isinstance(field, ImageField):
+            continue
+        if update_fields is not None and field.name not in update_fields:
+            continue
+        field_file = getattr(instance, field.attname)
+        if field_file:
+            files[field_file.name] = (field_label(model, field), uploaded.get(field.attname, (None, None)))
+    if not files:
+        return
+
+    known = set(ImageAsset.objects.filter(name__in=files).values_list('name', flat=True))
+    for name, (label, (width, height)) in files.items():
+        if name in known:
+            continue
+        # Files that weren't just uploaded get their dimensions from the job
+        ImageAsset.objects.get_or_create(name=name, defaults={'field': label, 'width': width, 'height': height})
+        image_worker.submit(name)
+
+
+def read_dimensions(file, name=''):
+    """Upright (width, height) of an open image file, or (None, None); keeps its position."""
+    position = file.tell()
+    try:
+        file.seek(0)
+        with Image.open(file) as img:
+            return ImageOptimizer.upright_size(img)
+    except Exception:
+        logger.warning("Could not read the dimensions of %s", name, exc_info=True)
+        return None, None
+    finally:
+        file.seek(position)
@@ -0,0 +1,170 @@
+"""
+Markdown rendering with a memoizing cache.
+
+Building a Markdown converter and running codehilite (Pygments) is by far the
+most expensive part of rendering project and blog pages, and the source text
+rarely changes. Rendered HTML is kept in a bounded per-process LRU, optionally
+backed by the shared Django cache, keyed by a hash of the source text and the
+extension config. Each thread reuses one pre-built converter.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import markdown as md
+from django.conf import settings
+from django.core.cache import cache
+
+
+MARKDOWN_EXTENSIONS = [
+    'extra',          # Tables, fenced code blocks, etc.
+    'codehilite',     # Syntax highlighting
+    'nl2br',          # Newline to <br>
+    'sane_lists',     # Better list handling
+]
+MARKDOWN_EXTENSION_CONFIGS = {}
+
+# Identifies the extension setup, so changing it never serves stale HTML
+CONFIG_DIGEST = hashlib.sha1(
+    json.dumps([MARKDOWN_EXTENSIONS, MARKDOWN_EXTENSION_CONFIGS], sort_keys=True).encode('utf-8')
+).hexdigest()[:12]
+
+# Full documents (blog posts) also get heading anchors and a table of contents
+DOCUMENT_EXTENSIONS = MARKDOWN_EXTENSIONS + ['toc']
+
+_local = threading.local()
+
+
+def get_converter():
+    """Return this thread's Markdown converter, building it on first use."""
+    converter = getattr(_local, 'converter', None)
+    if converter is None:
+        converter = md.Markdown(
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        )
+        _local.converter = converter
+    return converter
+
+
+def get_document_converter():
+    """Return this thread's converter for full documents."""
+    converter = getattr(_local, 'document_converter', None)
+    if converter is None:
+        converter = md.Markdown(
+            extensions=DOCUMENT_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        )
+        _local.document_converter = converter
+    return converter
+
+
+class RenderCache:
+    """Bounded LRU of rendered HTML with an optional shared-cache tier."""
+
+    def __init__(self, maxsize=512, use_shared_cache=False, shared_timeout=60 * 60 * 24):
+        self.maxsize = maxsize
+        self.use_shared_cache = use_shared_cache
+        self.shared_timeout = shared_timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return f'markdown:{CONFIG_DIGEST}:{digest}'
+
+    def get(self, key):
+        with self._lock:
+            html = self._data.get(key)
+            if html is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return html
+
+        if self.use_shared_cache:
+            html = cache.get(key)
+            if html is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                self._store_local(key, html)
+                return html
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, html):
+        self._store_local(key, html)
+        if self.use_shared_cache:
+            cache.set(key, html, self.shared_timeout)
+
+    def _store_local(self, key, html):
+        with self._lock:
+            self._data[key] = html
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+    def info(self):
+        """Counters for tuning the cache size."""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+render_cache = RenderCache(
+    maxsize=getattr(settings, 'MARKDOWN_CACHE_SIZE', 512),
+    use_shared_cache=getattr(settings, 'MARKDOWN_SHARED_CACHE', False),
+)
+
+
+def render_markdown(text):
+    """Convert markdown text to HTML, using the render cache."""
+    if not text:
+        return ''
+
+    key = render_cache.key(text)
+    html = render_cache.get(key)
+    if html is None:
+        converter = get_converter()
+        try:
+            html = converter.convert(text)
+        finally:
+            converter.reset()
+        render_cache.set(key, html)
+    return html
+
+
+def render_document(text):
+    """
+    Convert a full markdown document.
+
+    Returns (html, toc_html); toc_html is empty when the document has no
+    headings. Not cached: meant to run once when the document is saved.
+    """
+    if not text:
+        return '', ''
+
+    converter = get_document_converter()
+    try:
+        html = converter.convert(text)
+        toc_html = converter.toc if converter.toc_tokens else ''
+    finally:
+        converter.reset()
+    return html, toc_html
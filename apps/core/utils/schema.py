@@ -0,0 +1,61 @@
+"""
+Schema readiness registry.
+
+Views used to call connection.introspection.table_names() on every request to
+guard against missing tables (fresh deploys, half-applied migrations). The
+registry does that catalog scan once per worker and caches the result.
+"""
+import threading
+import time
+
+from django.db import connection
+
+
+class SchemaRegistry:
+    """Cache of the database tables that exist, shared by the whole process."""
+
+    # How often to re-scan while some tables are still missing (seconds)
+    MISSING_RECHECK_INTERVAL = 60
+
+    def __init__(self):
+        self._tables = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Re-read the table list from the database."""
+        with self._lock:
+            try:
+                tables = frozenset(connection.introspection.table_names())
+            except Exception:
+                # Database unreachable: keep what we had and try again later
+                return self._tables
+            self._tables = tables
+            self._checked_at = time.monotonic()
+            return tables
+
+    def invalidate(self):
+        """Forget the cached table list; the next check will re-scan."""
+        with self._lock:
+            self._tables = None
+            self._checked_at = 0.0
+
+    def is_ready(self, model):
+        """Return True if the table backing ``model`` exists."""
+        table = model._meta.db_table
+        tables = self._tables
+        if tables is not None and table in tables:
+            return True
+
+        # Unknown or missing: scan again, but not more than once per interval
+        if tables is None or time.monotonic() - self._checked_at > self.MISSING_RECHECK_INTERVAL:
+            tables = self.refresh()
+        return tables is not None and table in tables
+
+
+schema_registry = SchemaRegistry()
+
+
+def is_ready(model):
+    """Shortcut for ``schema_registry.is_ready(model)``."""
+    return schema_registry.is_ready(model)
@@ -0,0 +1,184 @@
+"""
+On-demand thumbnails for sizes nobody generated ahead of time.
+
+``/media/thumb/<w>x<h>/<fit>/<path>?s=<signature>`` resizes the stored image
+at <path> to fit (``contain``) or fill and crop to (``cover``) a w x h box.
+URLs come from thumbnail_url() (or the ``thumbnail_url`` template tag) and
+carry an HMAC of the rest of the URL, so only sizes the site itself asks
+for are ever rendered; anything else is a 404 before a byte is decoded.
+
+Results are written once to a local disk cache (THUMBNAIL_CACHE_DIR) that
+is kept under THUMBNAIL_CACHE_MAX_BYTES by evicting the least recently
+used files. Concurrent requests for the same thumbnail are coalesced: one
+thread renders it while the others wait for the file, so a cold image is
+decoded once per process.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from PIL import Image, ImageOps
+
+from .image_optimizer import EXTENSIONS, ImageOptimizer
+
+FITS = ('contain', 'cover')
+
+signer = signing.Signer(salt='apps.core.thumbnails')
+
+
+def _signed_value(width, height, fit, name):
+    return f'{width}x{height}/{fit}/{name}'
+
+
+def thumbnail_url(name, width, height, fit='contain'):
+    """Signed URL of a thumbnail of the stored image at ``name``."""
+    signature = signer.signature(_signed_value(width, height, fit, name))
+    url = reverse('thumbnail', kwargs={'width': width, 'height': height, 'fit': fit, 'name': name})
+    return f'{url}?s={signature}'
+
+
+def check_signature(width, height, fit, name, signature):
+    expected = signer.signature(_signed_value(width, height, fit, name))
+    return constant_time_compare(expected, signature or '')
+
+
+def render_thumbnail(name, width, height, fit, img_format):
+    """Resize the stored image at ``name``; returns the encoded bytes."""
+    with default_storage.open(name, 'rb') as f:
+        with Image.open(f) as header:
+            size = ImageOptimizer.upright_size(header)
+        f.seek(0)
+        box = (width, height)
+        if fit == 'cover':
+            # Decode large enough to fill the box, not just fit inside it
+            scale = max(width / size[0], height / size[1])
+            box = (round(size[0] * scale), round(size[1] * scale))
+        source = ImageOptimizer.open_source(f, box, keep_alpha=img_format != 'JPEG')
+
+    if fit == 'cover' and source.image.size != (width, height):
+        target = ImageOptimizer.fit_size((width, height), source.image.size)
+        img = ImageOps.fit(source.image, target, Image.Resampling.LANCZOS)
+    else:
+        img = ImageOptimizer.resize_to_fit(source.image, (width, height))
+    # Fixed quality: an adaptive search would keep the first visitor waiting
+    return ImageOptimizer.encode(img, img_format)
+
+
+def output_format(name, accepts_webp):
+    """Format to serve: WebP where the browser takes it, else JPEG (PNG for PNG sources)."""
+    if accepts_webp:
+        return 'WEBP'
+    return 'PNG' if name.lower().endswith('.png') else 'JPEG'
+
+
+class ThumbnailCache:
+    """
+    Bounded on-disk LRU cache of rendered thumbnails.
+
+    The index of files, sizes and recency lives in memory and is rebuilt
+    from the directory (least recently used first) on first use. Hits touch
+    the file's mtime so the order survives restarts. Processes sharing the
+    directory pick up each other's files and evict independently; a file
+    evicted by another process is simply a miss.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def path_for(self, key, img_format):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.root / digest[:2] / f'{digest}{EXTENSIONS[img_format]}'
+
+    def open(self, key, img_format, render):
+        """
+        Open the cached thumbnail for ``key``, calling ``render()`` for the
+        bytes if it isn't cached. Only one thread renders a given key.
+        """
+        path = self.path_for(key, img_format)
+        file = self._open_cached(path)
+        if file is not None:
+            return file
+
+        with self._lock:
+            key_lock = self._inflight.setdefault(path, threading.Lock())
+        with key_lock:
+            try:
+                file = self._open_cached(path)
+                if file is None:
+                    self._store(path, render())
+                    file = path.open('rb')
+                return file
+            finally:
+                with self._lock:
+                    self._inflight.pop(path, None)
+
+    def _load_index(self):
+        entries = []
+        if self.root.exists():
+            for file in self.root.glob('*/*'):
+                if file.name.startswith('.'):
+                    continue  # Half-written
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, file, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((file, size) for _, file, size in entries)
+        self._total = sum(self._index.values())
+
+    def _open_cached(self, path):
+        with self._lock:
+            if self._index is None:
+                self._load_index()
+            try:
+                # An open file survives eviction, so the response can't break
+                file = path.open('rb')
+                os.utime(path)
+            except FileNotFoundError:
+                self._total -= self._index.pop(path, 0)
+                return None
+            if path not in self._index:
+                # Rendered by another process
+                size = os.fstat(file.fileno()).st_size
+                self._index[path] = size
+                self._total += size
+            self._index.move_to_end(path)
+            return file
+
+    def _store(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.name}.{threading.get_ident()}')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._total += len(data) - self._index.pop(path, 0)
+            self._index[path] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._index) > 1:
+            path, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+thumbnail_cache = ThumbnailCache(
+    getattr(settings, 'THUMBNAIL_CACHE_DIR', Path(settings.BASE_DIR) / 'thumbnail_cache'),
+    getattr(settings, 'THUMBNAIL_CACHE_MAX_BYTES', 256 * 1024 * 1024),
+)
@@ -0,0 +1,103 @@
+"""
+User-agent classification.
+
+Turns a raw User-Agent header into browser, OS, device class and a bot flag
+using a small set of regexes compiled once at import. Visitors repeat the
+same handful of strings, so results are memoized in an LRU; batch callers
+(backfills) go through ``classify_many`` which classifies each distinct
+string once.
+
+The rules only need to be good enough for analytics: first match wins, and
+anything unrecognised is reported as 'Other'.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+UserAgentInfo = namedtuple('UserAgentInfo', ['browser', 'os', 'device', 'is_bot'])
+
+DEVICE_DESKTOP = 'desktop'
+DEVICE_MOBILE = 'mobile'
+DEVICE_TABLET = 'tablet'
+DEVICE_BOT = 'bot'
+
+DEVICE_CHOICES = [
+    (DEVICE_DESKTOP, 'Desktop'),
+    (DEVICE_MOBILE, 'Mobile'),
+    (DEVICE_TABLET, 'Tablet'),
+    (DEVICE_BOT, 'Bot'),
+]
+
+# Crawlers, link previewers, monitors and HTTP libraries
+BOT_RE = re.compile(
+    r'bot\b|bot/|crawl|spider|slurp|mediapartners|facebookexternalhit|embedly|'
+    r'preview|lighthouse|headless|phantomjs|puppeteer|playwright|selenium|'
+    r'curl|wget|httpie|python-requests|python-urllib|aiohttp|httpx|go-http-client|'
+    r'java/|okhttp|axios|node-fetch|libwww|scrapy|feedfetcher|uptime|pingdom|monitor',
+    re.IGNORECASE,
+)
+
+# Order matters: most browsers also claim to be Chrome and/or Safari
+BROWSER_RULES = [
+    ('Edge', re.compile(r'Edg(?:e|A|iOS)?/')),
+    ('Opera', re.compile(r'OPR/|Opera')),
+    ('Samsung Internet', re.compile(r'SamsungBrowser/')),
+    ('Firefox', re.compile(r'Firefox/|FxiOS/')),
+    ('Chrome', re.compile(r'Chrome/|CriOS/')),
+    ('Safari', re.compile(r'Version/[\d.]+.*Safari/')),
+    ('Internet Explorer', re.compile(r'MSIE |Trident/')),
+]
+
+OS_RULES = [
+    ('iOS', re.compile(r'iPhone|iPad|iPod')),
+    ('Android', re.compile(r'Android')),
+    ('Windows', re.compile(r'Windows')),
+    ('macOS', re.compile(r'Mac OS X|Macintosh')),
+    ('ChromeOS', re.compile(r'CrOS')),
+    ('Linux', re.compile(r'Linux')),
+]
+
+TABLET_RE = re.compile(r'iPad|Tablet|Android(?!.*Mobile)', re.IGNORECASE)
+MOBILE_RE = re.compile(r'Mobi|iPhone|iPod|Android.*Mobile|Windows Phone', re.IGNORECASE)
+
+
+def _first_match(rules, user_agent):
+    for name, pattern in rules:
+        if pattern.search(user_agent):
+            return name
+    return 'Other'
+
+
+@lru_cache(maxsize=2048)
+def classify(user_agent):
+    """
+    Classify a User-Agent string.
+
+    An empty header counts as a bot: every real browser sends one.
+    """
+    user_agent = (user_agent or '').strip()
+    if not user_agent or BOT_RE.search(user_agent):
+        return UserAgentInfo('Other', _first_match(OS_RULES, user_agent), DEVICE_BOT, True)
+
+    if TABLET_RE.search(user_agent):
+        device = DEVICE_TABLET
+    elif MOBILE_RE.search(user_agent):
+        device = DEVICE_MOBILE
+    else:
+        device = DEVICE_DESKTOP
+    return UserAgentInfo(
+        _first_match(BROWSER_RULES, user_agent),
+        _first_match(OS_RULES, user_agent),
+        device,
+        False,
+    )
+
+
+def classify_many(user_agents):
+    """Classify many strings at once; returns {user_agent: UserAgentInfo}."""
+    return {user_agent: classify(user_agent) for user_agent in set(user_agents)}
+
+
+def is_bot_request(request):
+    """Whether a request comes from a crawler or script."""
+    return classify(request.META.get('HTTP_USER_AGENT', '')).is_bot
@@ -0,0 +1,54 @@
+"""
+Validators for files uploaded by visitors.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+
+def validate_image_upload(file):
+    """
+    Reject an uploaded image that is too big to process safely.
+
+    Checks the file size, then the pixel count and frame count from the
+    image header, so nothing is decoded: a small file that inflates to
+    gigapixels (a decompression bomb) is refused as cheaply as a large one.
+    Limits come from IMAGE_UPLOAD_MAX_BYTES, IMAGE_UPLOAD_MAX_PIXELS and
+    IMAGE_UPLOAD_MAX_FRAMES.
+    """
+    max_bytes = getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+    max_pixels = getattr(settings, 'IMAGE_UPLOAD_MAX_PIXELS', 25_000_000)
+    max_frames = getattr(settings, 'IMAGE_UPLOAD_MAX_FRAMES', 1)
+
+    if file.size > max_bytes:
+        raise ValidationError(
+            'Please upload an image smaller than %(limit)s.',
+            code='file_too_large',
+            params={'limit': filesizeformat(max_bytes)},
+        )
+
+    position = file.tell()
+    try:
+        # Opening only parses the header; Pillow's own bomb check can fire here
+        with Image.open(file) as img:
+            width, height = img.size
+            frames = getattr(img, 'n_frames', 1)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ValidationError('Please upload a valid image.', code='invalid_image')
+    finally:
+        file.seek(position)
+
+    if width * height > max_pixels:
+        raise ValidationError(
+            'This image is %(width)s x %(height)s pixels; please upload one under %(limit)s megapixels.',
+            code='too_many_pixels',
+            params={'width': width, 'height': height, 'limit': max_pixels // 1_000_000},
+        )
+    if frames > max_frames:
+        raise ValidationError(
+            'Animated images are not supported.' if max_frames == 1
+            else 'Please upload an image with at most %(limit)s frames.',
+            code='too_many_frames',
+            params={'limit': max_frames},
+        )
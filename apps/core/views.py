@@ -2,57 +2,52 @@
 Views for core app.
 """
 
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_vary_headers
 from django.views.generic import TemplateView
-from django.db import connection
+from django.views.static import serve
+from .conditional import ConditionalContentMixin
 from .models import Skill
-from apps.projects.models import Project
-from apps.experience.models import Experience
-from apps.education.models import Education, Certification
+from .snapshot import get_snapshot
+from .storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed
+from .utils.image_optimizer import ImageTooLarge
+from .utils.thumbnails import FITS, check_signature, output_format, render_thumbnail, thumbnail_cache
 
 
-class LandingView(TemplateView):
+class LandingView(ConditionalContentMixin, TemplateView):
     """Focused landing page with key highlights."""
     template_name = 'pages/landing.html'
     
-    def _table_exists(self, table_name):
-        """Check if a database table exists using Django introspection."""
-        try:
-            table_names = connection.introspection.table_names()
-            return table_name in table_names
-        except Exception:
-            return False
+    def get_validator_objects(self):
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return None
+        # Experiences feed the years-of-experience figure
+        return [
+            *snapshot.about_projects[:4], *snapshot.featured_skills, *snapshot.certifications[:4],
+            *snapshot.experiences,
+        ]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         try:
+            snapshot = get_snapshot()
+            
             # Featured projects (projects marked to show on about page, top 4)
-            if self._table_exists('projects_project'):
-                context['featured_projects'] = Project.objects.filter(
-                    show_on_about_page=True
-                ).order_by('order', '-created_at')[:4]
-            else:
-                context['featured_projects'] = []
+            context['featured_projects'] = snapshot.about_projects[:4]
             
             # Featured skills by category
-            if self._table_exists('core_skill'):
-                skills = Skill.objects.filter(is_active=True, is_featured=True).order_by('order', 'name')
-                context['top_skills_by_category'] = {}
-                for skill in skills:
-                    category = skill.get_category_display()
-                    if category not in context['top_skills_by_category']:
-                        context['top_skills_by_category'][category] = []
-                    context['top_skills_by_category'][category].append(skill)
-            else:
-                context['top_skills_by_category'] = {}
+            context['top_skills_by_category'] = {}
+            for skill in snapshot.featured_skills:
+                category = skill.get_category_display()
+                if category not in context['top_skills_by_category']:
+                    context['top_skills_by_category'][category] = []
+                context['top_skills_by_category'][category].append(skill)
             
             # Featured certifications (top 4)
-            if self._table_exists('education_certification'):
-                context['featured_certifications'] = Certification.objects.filter(
-                    is_visible=True
-                ).order_by('order', '-date_obtained')[:4]
-            else:
-                context['featured_certifications'] = []
+            context['featured_certifications'] = snapshot.certifications[:4]
                 
         except Exception:
             context['featured_projects'] = []
@@ -64,12 +59,10 @@ class LandingView(TemplateView):
     def _calculate_experience_years(self):
         """Calculate total years of experience."""
         try:
-            if not self._table_exists('experience_experience'):
-                return 0
             from datetime import date
-            from django.db.models import Min
-            first_job = Experience.objects.filter(is_visible=True).aggregate(Min('start_date'))['start_date__min']
-            if first_job:
+            experiences = get_snapshot().experiences
+            if experiences:
+                first_job = min(exp.start_date for exp in experiences)
                 years = (date.today() - first_job).days / 365.25
                 return int(years)
         except Exception:
@@ -77,112 +70,75 @@ class LandingView(TemplateView):
         return 0
 
 
-class AboutView(TemplateView):
+class AboutView(ConditionalContentMixin, TemplateView):
     """Comprehensive about page with full details."""
     template_name = 'pages/about.html'
     
-    def _table_exists(self, table_name):
-        """Check if a database table exists using Django introspection."""
-        try:
-            table_names = connection.introspection.table_names()
-            return table_name in table_names
-        except Exception:
-            return False
+    def get_validator_objects(self):
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return None
+        return [
+            *snapshot.skills, *snapshot.about_projects, *snapshot.experiences, *snapshot.education,
+            *snapshot.certifications, *snapshot.testimonials, *snapshot.blog_posts,
+        ]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         try:
+            snapshot = get_snapshot()
+            
+            # Lets the section cache tags tell whether this data is current
+            context['content_version'] = snapshot.version
+            
             # All skills grouped hierarchically for cyberpunk design
-            if self._table_exists('core_skill'):
-                from collections import OrderedDict
-                skills = Skill.objects.filter(is_active=True)
-                
-                #Define category order for numbered cards (01-06)
-                category_order = [
-                    'compute',
-                    'data',
-                    'platform',
-                    'devops',
-                    'observability',
-                    'architecture',
-                ]
-                
-                # Group skills by category and subcategory
-                skills_hierarchy = {}
-                for skill in skills:
-                    category = skill.category
-                    if category not in skills_hierarchy:
-                        skills_hierarchy[category] = {}
-                    
-                    subcategory = skill.subcategory
-                    if subcategory not in skills_hierarchy[category]:
-                        skills_hierarchy[category][subcategory] = []
+            #Define category order for numbered cards (01-06)
+            category_order = [
+                'compute',
+                'data',
+                'platform',
+                'devops',
+                'observability',
+                'architecture',
+            ]
+            
+            # Build ordered structure with metadata, grouping each category by subcategory
+            context['skills_categories'] = []
+            for idx, cat_key in enumerate(category_order, 1):
+                if cat_key in snapshot.skills_by_category:
+                    subcategories = {}
+                    for skill in snapshot.skills_by_category[cat_key]:
+                        subcategories.setdefault(skill.subcategory, []).append(skill)
                     
-                    skills_hierarchy[category][subcategory].append(skill)
-                
-                # Build ordered structure with metadata
-                context['skills_categories'] = []
-                for idx, cat_key in enumerate(category_order, 1):
-                    if cat_key in skills_hierarchy:
-                        context['skills_categories'].append({
-                            'number': f'{idx:02d}',  # 01, 02, 03, etc.
-                            'key': cat_key,
-                            'name': dict(Skill.CATEGORY_CHOICES)[cat_key],
-                            'description': Skill.CATEGORY_DESCRIPTIONS[cat_key],
-                            'icon': Skill.CATEGORY_ICONS[cat_key],
-                            'subcategories': skills_hierarchy[cat_key]
-                        })
-            else:
-                context['skills_categories'] = []
+                    context['skills_categories'].append({
+                        'number': f'{idx:02d}',  # 01, 02, 03, etc.
+                        'key': cat_key,
+                        'name': dict(Skill.CATEGORY_CHOICES)[cat_key],
+                        'description': Skill.CATEGORY_DESCRIPTIONS[cat_key],
+                        'icon': Skill.CATEGORY_ICONS[cat_key],
+                        'subcategories': subcategories
+                    })
             
             # Projects marked to show on about page
-            if self._table_exists('projects_project'):
-                context['projects'] = Project.objects.filter(
-                    show_on_about_page=True
-                ).order_by('order', '-created_at')
-            else:
-                context['projects'] = []
+            context['projects'] = snapshot.about_projects
             
             # All experience
-            if self._table_exists('experience_experience'):
-                context['experiences'] = Experience.objects.filter(
-                    is_visible=True
-                ).order_by('-start_date')
-            else:
-                context['experiences'] = []
+            context['experiences'] = snapshot.experiences
             
             # All education
-            if self._table_exists('education_education'):
-                context['education'] = Education.objects.filter(is_visible=True)
-            else:
-                context['education'] = []
+            context['education'] = snapshot.education
             
             # All certifications
-            if self._table_exists('education_certification'):
-                context['certifications'] = Certification.objects.filter(
-                    is_visible=True
-                ).order_by('-date_obtained')
-            else:
-                context['certifications'] = []
+            context['certifications'] = snapshot.certifications_by_date
             
             # Approved testimonials
-            if self._table_exists('testimonials_testimonial'):
-                from apps.testimonials.models import Testimonial
-                context['testimonials'] = Testimonial.objects.filter(is_approved=True).order_by('order', '-created_at')
-            else:
-                context['testimonials'] = []
+            context['testimonials'] = snapshot.testimonials
             
             # All blog posts
-            if self._table_exists('blog_blogpost'):
-                from apps.blog.models import BlogPost
-                context['blog_posts'] = BlogPost.objects.filter(
-                    is_published=True
-                ).order_by('-published_date')
-            else:
-                context['blog_posts'] = []
+            context['blog_posts'] = snapshot.blog_posts_by_date
         except Exception:
-            context['skills_by_category'] = {}
+            context['skills_categories'] = []
             context['projects'] = []
             context['experiences'] = []
             context['education'] = []
@@ -197,6 +153,42 @@ class AboutView(TemplateView):
 HomeView = AboutView
 
 
+def thumbnail(request, width, height, fit, name):
+    """Serve a signed on-demand thumbnail (see utils.thumbnails)."""
+    max_size = getattr(settings, 'THUMBNAIL_MAX_DIMENSION', 2400)
+    if (
+        fit not in FITS
+        or not (0 < width <= max_size and 0 < height <= max_size)
+        or not check_signature(width, height, fit, name, request.GET.get('s'))
+    ):
+        raise Http404
+    
+    img_format = output_format(name, 'image/webp' in request.headers.get('Accept', ''))
+    try:
+        file = thumbnail_cache.open(
+            f'{width}x{height}/{fit}/{name}',
+            img_format,
+            lambda: render_thumbnail(name, width, height, fit, img_format),
+        )
+    except (OSError, ImageTooLarge):
+        # Missing, unreadable or oversized original
+        raise Http404
+    
+    response = FileResponse(file, content_type=f'image/{img_format.lower()}')
+    # Stored files are never overwritten, so a thumbnail URL never changes
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def serve_media(request, path):
+    """Serve local media (development); content-addressed files are cached forever."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
 def custom_404(request, exception):
     """Custom 404 error handler."""
     from django.shortcuts import render
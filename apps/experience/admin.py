@@ -1,10 +1,10 @@
 from django.contrib import admin
-from adminsortable2.admin import SortableAdminMixin
+from apps.core.admin_mixins import SortableContentAdminMixin
 from .models import Experience
 
 
 @admin.register(Experience)
-class ExperienceAdmin(SortableAdminMixin, admin.ModelAdmin):
+class ExperienceAdmin(SortableContentAdminMixin, admin.ModelAdmin):
     list_display = ('position', 'company_name', 'employment_type', 'start_date', 'is_current', 'is_visible', 'order')
     list_filter = ('employment_type', 'is_current', 'is_visible')
     list_editable = ('is_current', 'is_visible')
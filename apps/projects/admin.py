@@ -1,5 +1,6 @@
 from django.contrib import admin
-from adminsortable2.admin import SortableAdminMixin, SortableInlineAdminMixin
+from adminsortable2.admin import SortableInlineAdminMixin
+from apps.core.admin_mixins import SortableContentAdminMixin
 from .models import Project, ProjectImage
 from .forms import ProjectAdminForm
 
@@ -11,7 +12,7 @@ class ProjectImageInline(SortableInlineAdminMixin, admin.TabularInline):
 
 
 @admin.register(Project)
-class ProjectAdmin(SortableAdminMixin, admin.ModelAdmin):
+class ProjectAdmin(SortableContentAdminMixin, admin.ModelAdmin):
     form = ProjectAdminForm
     list_display = ('title', 'get_categories_short', 'status', 'stars', 'show_on_about_page', 'order', 'created_at')
     list_filter = ('status', 'show_on_about_page')
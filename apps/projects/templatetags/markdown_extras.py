@@ -4,7 +4,7 @@ Custom template tags for markdown rendering.
 
 from django import template
 from django.utils.safestring import mark_safe
-import markdown as md
+from apps.core.utils.markdown_renderer import render_markdown
 
 register = template.Library()
 
@@ -14,19 +14,9 @@ def markdown_format(text):
     """
     Convert markdown text to HTML.
     Supports: bold, italic, code, links, lists, headings.
+    Results are memoized, see apps.core.utils.markdown_renderer.
     """
     if not text:
         return ''
     
-    # Configure markdown with extensions
-    html = md.markdown(
-        text,
-        extensions=[
-            'extra',          # Tables, fenced code blocks, etc.
-            'codehilite',     # Syntax highlighting
-            'nl2br',          # Newline to <br>
-            'sane_lists',     # Better list handling
-        ]
-    )
-    
-    return mark_safe(html)
+    return mark_safe(render_markdown(text))
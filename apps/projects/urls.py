@@ -9,5 +9,6 @@ app_name = 'projects'
 
 urlpatterns = [
     path('', views.ProjectListView.as_view(), name='list'),
+    path('page/<int:page>/', views.ProjectListView.as_view(), name='list_page'),
     path('<slug:slug>/', views.ProjectDetailView.as_view(), name='detail'),
 ]
\ No newline at end of file
@@ -2,28 +2,30 @@
 Views for projects app.
 """
 
+from django.http import Http404
 from django.views.generic import ListView, DetailView
-from django.db import connection
+from apps.core.conditional import ConditionalContentMixin
+from apps.core.snapshot import get_snapshot
+from apps.core.utils.schema import is_ready
 from .models import Project
 
 
-class ProjectListView(ListView):
+class ProjectListView(ConditionalContentMixin, ListView):
     """Display all published projects."""
     model = Project
     template_name = 'pages/projects/list.html'
     context_object_name = 'projects'
     paginate_by = 12
     
-    def _table_exists(self, table_name):
-        """Check if a database table exists using Django introspection."""
-        try:
-            table_names = connection.introspection.table_names()
-            return table_name in table_names
-        except Exception:
-            return False
+    def get_validator_objects(self):
+        # Pagination and category filters only ever show a subset of these
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.projects
     
     def get_queryset(self):
-        if not self._table_exists('projects_project'):
+        if not is_ready(Project):
             return Project.objects.none()
         
         queryset = Project.objects.all()
@@ -43,11 +45,27 @@ class ProjectListView(ListView):
         return context
 
 
-class ProjectDetailView(DetailView):
+class ProjectDetailView(ConditionalContentMixin, DetailView):
     """Display single project detail."""
     model = Project
     template_name = 'pages/projects/detail.html'
     context_object_name = 'project'
     
+    def get_validator_objects(self):
+        snapshot = get_snapshot()
+        project = snapshot and snapshot.projects_by_slug.get(self.kwargs['slug'])
+        if project is None:
+            return None
+        return [project, *project.images.all()]
+    
     def get_queryset(self):
-        return Project.objects.all()
\ No newline at end of file
+        return Project.objects.all()
+    
+    def get_object(self, queryset=None):
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return super().get_object(queryset)
+        try:
+            return snapshot.projects_by_slug[self.kwargs['slug']]
+        except KeyError:
+            raise Http404("No project found matching the query")
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from adminsortable2.admin import SortableAdminMixin
+from apps.core.admin_mixins import SortableContentAdminMixin
 from .models import Testimonial
 
 
 @admin.register(Testimonial)
-class TestimonialAdmin(SortableAdminMixin, admin.ModelAdmin):
+class TestimonialAdmin(SortableContentAdminMixin, admin.ModelAdmin):
     list_display = ('author', 'company', 'position', 'rating', 'is_approved', 'is_featured', 'order')
     list_filter = ('is_approved', 'is_featured', 'rating', 'created_at')
     search_fields = ('author', 'company', 'content')
@@ -1,4 +1,5 @@
 from django import forms
+from apps.core.validators import validate_image_upload
 from .models import Testimonial
 
 
@@ -51,3 +52,9 @@ class TestimonialSubmissionForm(forms.ModelForm):
             'linkedin_url': 'Help us verify your identity',
             'photo': 'A professional photo to display with your testimonial'
         }
+    
+    def clean_photo(self):
+        photo = self.cleaned_data.get('photo')
+        if photo:
+            validate_image_upload(photo)
+        return photo
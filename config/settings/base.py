@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.core.middleware.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -94,6 +95,19 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
+# Cache
+# Use a shared backend (redis, memcached, file) in production so every
+# worker sees the same content version.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Full-page cache for anonymous visitors (see apps.core.middleware)
+PAGE_CACHE_NAMESPACES = ['core', 'projects', 'blog']
+PAGE_CACHE_TIMEOUT = env.int('PAGE_CACHE_TIMEOUT', default=60 * 60)
+
+
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
@@ -154,6 +168,59 @@ STATICFILES_DIRS = [
 # Media files (User uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Files are named by content hash, deduplicated and cached forever (apps.core.storage)
+DEFAULT_FILE_STORAGE = 'apps.core.storage.ContentAddressedFileSystemStorage'
+
+# Rendered markdown cache (see apps.core.utils.markdown_renderer)
+MARKDOWN_CACHE_SIZE = env.int('MARKDOWN_CACHE_SIZE', default=512)
+MARKDOWN_SHARED_CACHE = env.bool('MARKDOWN_SHARED_CACHE', default=False)
+
+# Seconds between writes of buffered blog view counts (0 writes on every view)
+BLOG_VIEW_FLUSH_INTERVAL = env.int('BLOG_VIEW_FLUSH_INTERVAL', default=30)
+
+# Background writes of resume download events (see apps.analytics.tracking)
+RESUME_DOWNLOAD_FLUSH_INTERVAL = env.int('RESUME_DOWNLOAD_FLUSH_INTERVAL', default=5)
+RESUME_DOWNLOAD_BATCH_SIZE = env.int('RESUME_DOWNLOAD_BATCH_SIZE', default=100)
+RESUME_DOWNLOAD_QUEUE_LIMIT = env.int('RESUME_DOWNLOAD_QUEUE_LIMIT', default=10000)
+
+# Repeat resume downloads / blog views from the same visitor within this many
+# seconds are dropped (0 disables); see apps.core.utils.dedup
+EVENT_DEDUP_WINDOW = env.int('EVENT_DEDUP_WINDOW', default=30)
+EVENT_DEDUP_MAX_KEYS = env.int('EVENT_DEDUP_MAX_KEYS', default=20000)
+
+# Local GeoLite2-City (.mmdb) file for download locations; empty disables lookups
+GEOIP_DATABASE = env.str('GEOIP_DATABASE', default='')
+GEOIP_CACHE_SIZE = env.int('GEOIP_CACHE_SIZE', default=4096)
+
+# Background image optimization (see apps.core.utils.image_worker);
+# 0 threads runs jobs inline after the saving transaction commits
+IMAGE_WORKER_THREADS = env.int('IMAGE_WORKER_THREADS', default=1)
+IMAGE_JOB_MAX_ATTEMPTS = env.int('IMAGE_JOB_MAX_ATTEMPTS', default=3)
+IMAGE_JOB_RETRY_DELAY = env.int('IMAGE_JOB_RETRY_DELAY', default=30)
+
+# Adaptive image encoding (see ImageOptimizer.encode_best): the smallest
+# format/quality whose SSIM against the source reaches the threshold, within
+# a CPU budget in seconds per encoded file
+IMAGE_ADAPTIVE_ENCODING = env.bool('IMAGE_ADAPTIVE_ENCODING', default=True)
+IMAGE_ENCODE_BUDGET = env.float('IMAGE_ENCODE_BUDGET', default=1.5)
+IMAGE_SIMILARITY_THRESHOLD = env.float('IMAGE_SIMILARITY_THRESHOLD', default=0.98)
+
+# Image limits: uploads from visitors are checked from the header against
+# these (apps.core.validators), and no image is decoded to more pixels than
+# IMAGE_MAX_DECODE_PIXELS (after JPEG draft scaling)
+IMAGE_UPLOAD_MAX_BYTES = env.int('IMAGE_UPLOAD_MAX_BYTES', default=10 * 1024 * 1024)
+IMAGE_UPLOAD_MAX_PIXELS = env.int('IMAGE_UPLOAD_MAX_PIXELS', default=25_000_000)
+IMAGE_UPLOAD_MAX_FRAMES = env.int('IMAGE_UPLOAD_MAX_FRAMES', default=1)
+IMAGE_MAX_DECODE_PIXELS = env.int('IMAGE_MAX_DECODE_PIXELS', default=40_000_000)
+
+# On-demand thumbnails (see apps.core.utils.thumbnails): local LRU disk cache
+# capped at this many bytes, and the largest width or height served
+THUMBNAIL_CACHE_DIR = env.str('THUMBNAIL_CACHE_DIR', default=str(BASE_DIR / 'thumbnail_cache'))
+THUMBNAIL_CACHE_MAX_BYTES = env.int('THUMBNAIL_CACHE_MAX_BYTES', default=256 * 1024 * 1024)
+THUMBNAIL_MAX_DIMENSION = env.int('THUMBNAIL_MAX_DIMENSION', default=2400)
+
+# Output of the export_static management command
+STATIC_EXPORT_ROOT = BASE_DIR / 'static_export'
 
 # Django Cotton configuration
 COTTON_DIR = "cotton"
\ No newline at end of file
@@ -14,6 +14,11 @@ DATABASES = {
     )
 }
 
+# Shared cache so all gunicorn workers agree on the content version
+CACHES = {
+    'default': env.cache('CACHE_URL', default='filecache:///tmp/portfolio_cache'),
+}
+
 # Security settings
 DEBUG = True
 TEMPLATE_DEBUG = False 
@@ -100,7 +105,8 @@ if USE_S3:
         # S3 settings - public bucket without ACLs
         AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.{AWS_S3_REGION_NAME}.amazonaws.com'
         AWS_S3_OBJECT_PARAMETERS = {
-            'CacheControl': 'max-age=86400',
+            # Object names are content hashes (apps.core.storage), so they never change
+            'CacheControl': 'public, max-age=31536000, immutable',
         }
         AWS_DEFAULT_ACL = None  # Don't set ACLs (use bucket policy instead)
         AWS_QUERYSTRING_AUTH = False  # Don't use signed URLs
@@ -109,7 +115,7 @@ if USE_S3:
         AWS_S3_SIGNATURE_VERSION = 's3v4'
         
         # Media files configuration
-        DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+        DEFAULT_FILE_STORAGE = 'apps.core.storage.ContentAddressedS3Storage'
         MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
     else:
         # Fall back to local storage if S3 credentials missing
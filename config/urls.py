@@ -2,15 +2,19 @@
 URL configuration for portfolio project.
 """
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from django.views.generic.base import RedirectView
+from apps.core.views import serve_media, thumbnail
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('favicon.ico', RedirectView.as_view(url='/static/favicon/favicon.ico', permanent=True)),
+    # Signed on-demand thumbnails; before the development media route below
+    path('media/thumb/<int:width>x<int:height>/<str:fit>/<path:name>', thumbnail, name='thumbnail'),
     path('', include('apps.core.urls')),
     path('projects/', include('apps.projects.urls')),
     path('blog/', include('apps.blog.urls')),
@@ -21,7 +25,9 @@ urlpatterns = [
 
 # Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media),
+    ]
 
 # Custom error handlers
 handler404 = 'apps.core.views.custom_404'